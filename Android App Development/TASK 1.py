@@ -1,20 +1,127 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 from tkinter import ttk
-import json
-import os
 from datetime import datetime
+from todo_core import TodoList, VIEWS, SORTS
 
-TASKS_FILE = "tasks.json"
+STORAGE_BACKEND = "journal"  # "journal" (tasks.json + tasks.journal) or "sqlite" (tasks.db)
+VISIBLE_ROWS = 15
+OVERSCAN_ROWS = 5
+MAX_DELETED_SHARE = 8  # Compact the row order once 1/8 of it is deleted rows
+MAX_REMINDER_SLEEP_MS = 6 * 60 * 60 * 1000  # Re-check at least this often in case the clock jumps
+
+class VirtualTaskList:
+    # Keeps only the visible window of rows (plus a few rows of overscan above and
+    # below) as Treeview items and re-fills them from the task data on scroll.
+    # Deleted ids stay in `order` as skipped rows until the next refresh (or
+    # until too many pile up), so a delete doesn't search the whole list.
+    def __init__(self, parent, tree, row_values, height=VISIBLE_ROWS, overscan=OVERSCAN_ROWS):
+        self.tree = tree
+        self.row_values = row_values
+        self.height = height
+        self.overscan = overscan
+        self.tasks = {}
+        self.order = []
+        self.deleted = set()
+        self.offset = 0
+        self.window = []
+
+        self.tree.configure(height=height)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.on_scrollbar)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+
+    def set_tasks(self, tasks, order=None):
+        self.tasks = tasks
+        self.order = list(tasks) if order is None else order
+        self.deleted = set()
+        self.render()  # Keeps the scroll position, clamped to the new length
+
+    def insert(self, task):
+        self.order.append(task["id"])
+        if len(self.order) - 1 < self.offset + self.height + self.overscan:
+            self.render()
+        else:
+            self.update_scrollbar()
+
+    def update(self, task):
+        iid = str(task["id"])
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self.row_values(task))
+
+    def delete(self, task_id):
+        self.deleted.add(task_id)
+        if len(self.deleted) * MAX_DELETED_SHARE > len(self.order):
+            self.order = [i for i in self.order if i not in self.deleted]
+            self.deleted = set()
+        if str(task_id) in self.window:
+            self.render()
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.order) - self.height))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        self.offset = max(0, min(self.offset, len(self.order) - self.height))
+        start = max(0, self.offset - self.overscan)
+        wanted = self.offset + self.height + self.overscan - start
+        rows, above, index = [], 0, start
+        while len(rows) < wanted and index < len(self.order):
+            if self.order[index] not in self.deleted:
+                rows.append(self.order[index])
+                above += index < self.offset
+            index += 1
+        selected = self.tree.selection()
+
+        self.tree.delete(*self.window)
+        self.window = [str(task_id) for task_id in rows]
+        for task_id, iid in zip(rows, self.window):
+            self.tree.insert("", "end", iid=iid, values=self.row_values(self.tasks[task_id]))
+
+        keep = [iid for iid in selected if self.tree.exists(iid)]
+        if keep:
+            self.tree.selection_set(keep)
+        self.tree.yview_moveto(0)
+        self.tree.yview_scroll(above, "units")
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.order)
+        if total <= self.height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.order)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.height)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
 
 class ToDoApp:
-    def __init__(self, root):
+    def __init__(self, root, virtual=True, backend=STORAGE_BACKEND):
         self.root = root
+        self.virtual = virtual
         self.root.title("To-Do List App")
-        self.tasks = []
+        self.tasks = {}
+        self.todo = TodoList(backend)
+        self.reminder_job = None
+        self.reminder_armed_for = None
 
         self.setup_ui()
         self.load_tasks()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         # Input Fields
@@ -38,87 +145,169 @@ class ToDoApp:
         self.tree.heading("Due", text="Due Date")
         self.tree.heading("Status", text="Status")
         self.tree.grid(row=1, column=0, columnspan=4, padx=10, pady=10)
+        self.task_view = None
+        if self.virtual:
+            self.task_view = VirtualTaskList(self.root, self.tree, self.row_values)
+            self.task_view.scrollbar.grid(row=1, column=4, sticky="ns", pady=10)
 
         # Buttons
         tk.Button(self.root, text="Edit Task", command=self.edit_task).grid(row=2, column=0)
         tk.Button(self.root, text="Mark Complete", command=self.mark_complete).grid(row=2, column=1)
         tk.Button(self.root, text="Delete Task", command=self.delete_task).grid(row=2, column=2)
 
+        # Search, Filter and Sort
+        self.search_entry = tk.Entry(self.root, width=40)
+        self.search_entry.grid(row=3, column=0, padx=10, pady=5)
+        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_task_list())
+
+        self.view_var = tk.StringVar(value="All")
+        view_menu = ttk.Combobox(self.root, textvariable=self.view_var, state="readonly",
+                                 values=VIEWS)
+        view_menu.grid(row=3, column=1)
+        view_menu.bind("<<ComboboxSelected>>", lambda e: self.refresh_task_list())
+
+        self.sort_var = tk.StringVar(value="Added")
+        sort_menu = ttk.Combobox(self.root, textvariable=self.sort_var, state="readonly", width=12,
+                                 values=SORTS)
+        sort_menu.grid(row=3, column=2)
+        sort_menu.bind("<<ComboboxSelected>>", lambda e: self.refresh_task_list())
+
+        self.prefix_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.root, text="Word start", variable=self.prefix_var,
+                       command=self.refresh_task_list).grid(row=3, column=3)
+
     def add_task(self):
         title = self.task_entry.get()
         priority = self.priority_var.get()
         due_date = self.date_entry.get()
 
-        if not title.strip():
-            messagebox.showwarning("Input Error", "Task title is required.")
-            return
-
         try:
-            if due_date != "YYYY-MM-DD":
-                datetime.strptime(due_date, "%Y-%m-%d")
-        except ValueError:
-            messagebox.showwarning("Date Error", "Invalid date format. Use YYYY-MM-DD.")
+            task = self.todo.add(title, priority, due_date if due_date != "YYYY-MM-DD" else "")
+        except ValueError as e:
+            messagebox.showwarning("Input Error", str(e))
             return
 
-        task = {
-            "title": title,
-            "priority": priority,
-            "due_date": due_date if due_date != "YYYY-MM-DD" else "",
-            "completed": False
-        }
-        self.tasks.append(task)
-        self.save_tasks()
-        self.refresh_task_list()
+        if self.query_active():
+            self.refresh_task_list()
+        else:
+            self.insert_row(task)
+        self.arm_reminders()
 
-    def edit_task(self):
+    def selected_task(self):
         selected = self.tree.selection()
         if not selected:
-            return
+            return None
+        # Treeview item ids are the task ids, so no positional lookup is needed
+        return self.tasks[int(selected[0])]
 
-        index = self.tree.index(selected[0])
-        task = self.tasks[index]
+    def edit_task(self):
+        task = self.selected_task()
+        if task is None:
+            return
 
         new_title = simpledialog.askstring("Edit Task", "New title:", initialvalue=task["title"])
         if new_title:
-            task["title"] = new_title
-            self.save_tasks()
-            self.refresh_task_list()
+            self.show_update(self.todo.rename(task["id"], new_title))
 
     def mark_complete(self):
-        selected = self.tree.selection()
-        if not selected:
+        task = self.selected_task()
+        if task is None:
             return
 
-        index = self.tree.index(selected[0])
-        self.tasks[index]["completed"] = not self.tasks[index]["completed"]
-        self.save_tasks()
-        self.refresh_task_list()
+        self.show_update(self.todo.toggle(task["id"]))
 
     def delete_task(self):
-        selected = self.tree.selection()
-        if not selected:
+        task = self.selected_task()
+        if task is None:
             return
 
-        index = self.tree.index(selected[0])
-        del self.tasks[index]
-        self.save_tasks()
-        self.refresh_task_list()
+        self.todo.delete(task["id"])
+        if self.query_active():
+            self.refresh_task_list()
+        else:
+            self.delete_row(task["id"])
+        self.arm_reminders()
+
+    def show_update(self, task):
+        if self.query_active():
+            self.refresh_task_list()
+        else:
+            self.update_row(task)
+        self.arm_reminders()
+
+    def arm_reminders(self):
+        # A single pending after() for the earliest reminder, nothing polls in between
+        next_time = self.todo.reminders.next_time()
+        if next_time == self.reminder_armed_for and self.reminder_job:
+            return
+        if self.reminder_job:
+            self.root.after_cancel(self.reminder_job)
+            self.reminder_job = None
+        self.reminder_armed_for = next_time
+        if next_time is None:
+            return
+
+        delay_ms = int((next_time - datetime.now()).total_seconds() * 1000)
+        self.reminder_job = self.root.after(min(max(delay_ms, 0), MAX_REMINDER_SLEEP_MS), self.fire_reminders)
+
+    def fire_reminders(self):
+        self.reminder_job = None
+        due = self.todo.reminders.pop_due()
+        if due:
+            titles = [self.tasks[task_id]["title"] for task_id in due[:5]]
+            if len(due) > 5:
+                titles.append(f"...and {len(due) - 5} more")
+            messagebox.showinfo("⏰ Task Reminder", "Tasks due:\n" + "\n".join(titles))
+        self.arm_reminders()
+
+    def query_active(self):
+        return not self.todo.is_default_view(self.view_var.get(), self.sort_var.get(), self.search_entry.get())
+
+    def visible_ids(self):
+        return self.todo.query(self.view_var.get(), self.sort_var.get(),
+                               self.search_entry.get(), self.prefix_var.get())
+
+    def row_values(self, task):
+        status = "✔️ Done" if task["completed"] else "❌ Active"
+        return (task["priority"], task["due_date"], status)
+
+    def insert_row(self, task):
+        if self.task_view:
+            self.task_view.insert(task)
+        else:
+            self.tree.insert("", "end", iid=str(task["id"]), values=self.row_values(task))
+
+    def update_row(self, task):
+        if self.task_view:
+            self.task_view.update(task)
+        else:
+            self.tree.item(str(task["id"]), values=self.row_values(task))
+
+    def delete_row(self, task_id):
+        if self.task_view:
+            self.task_view.delete(task_id)
+        else:
+            self.tree.delete(str(task_id))
 
     def refresh_task_list(self):
+        order = self.visible_ids()
+        if self.task_view:
+            self.task_view.set_tasks(self.tasks, order)
+            return
         self.tree.delete(*self.tree.get_children())
-        for task in self.tasks:
-            status = "✔️ Done" if task["completed"] else "❌ Active"
-            self.tree.insert("", "end", values=(task["priority"], task["due_date"], status))
-
-    def save_tasks(self):
-        with open(TASKS_FILE, "w") as f:
-            json.dump(self.tasks, f, indent=2)
+        for task_id in (self.tasks if order is None else order):
+            self.insert_row(self.tasks[task_id])
 
     def load_tasks(self):
-        if os.path.exists(TASKS_FILE):
-            with open(TASKS_FILE, "r") as f:
-                self.tasks = json.load(f)
-            self.refresh_task_list()
+        self.tasks = self.todo.load()
+        self.refresh_task_list()
+        self.arm_reminders()
+
+    def on_close(self):
+        if self.reminder_job:
+            self.root.after_cancel(self.reminder_job)
+        self.todo.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -126,7 +315,7 @@ if __name__ == "__main__":
     root.mainloop()
 # This code implements a simple To-Do List application using Tkinter.       
 # It allows users to add, edit, mark complete, and delete tasks.    
-# Tasks are saved in a JSON file, and the application loads existing tasks on startup.
+# Tasks are saved in a JSON snapshot plus an append-only journal (tasks.journal), and the application replays both on startup.
 # The UI includes input fields for task title, priority, and due date, along with a tree view to display tasks.
 # The application also provides buttons for task management actions.    
 # Ensure you have the required files (tasks.json) in the same directory as this script.
@@ -6,20 +6,18 @@
 import customtkinter as ctk
 import tkinter.messagebox as mb
 from tkinter import Toplevel, Text
-import random
 import datetime
 import json
-import os
-import requests
+import time
 import pyperclip
 import webbrowser
+from quote_core import QuoteBook, QuoteCache, QuoteFetcher, QuoteStats, ROTATION_FILE, STATS_FILE
 
-QUOTES_FILE = "quotes.json"
-FAVORITES_FILE = "favorites.json"
-LAST_QUOTE_FILE = "last_quote.json"
+FAVORITES_PAGE_SIZE = 25
 
 class QuoteApp:
     def __init__(self, root):
+        self.started = time.perf_counter()
         self.root = root
         self.root.title("✨ Quote of the Day")
         self.root.geometry("600x400")
@@ -28,13 +26,19 @@ class QuoteApp:
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
 
-        self.quotes = self.load_local_quotes()
-        self.favorites = self.load_favorites()
+        # Online quotes are prefetched into an on-disk cache in the background,
+        # New Quote never waits on the network
+        self.stats = QuoteStats()
+        self.fetcher = QuoteFetcher(cache=QuoteCache(), stats=self.stats)
+        self.book = QuoteBook(fetcher=self.fetcher, rotation_file=ROTATION_FILE, stats=self.stats)
+        self.favorites = self.book.favorites
         self.current_quote = ""
 
         self.setup_ui()
         self.load_daily_quote()
         self.schedule_refresh()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<F12>", lambda e: self.show_stats())
 
     def setup_ui(self):
         self.quote_label = ctk.CTkLabel(self.root, text="", wraplength=550, font=("Arial", 16), justify="center")
@@ -54,23 +58,8 @@ class QuoteApp:
         ctk.CTkButton(share_frame, text="🐦 Share to Twitter", command=self.share_to_twitter).grid(row=0, column=0, padx=10)
         ctk.CTkButton(share_frame, text="📱 Share to WhatsApp", command=self.share_to_whatsapp).grid(row=0, column=1, padx=10)
 
-    def load_local_quotes(self):
-        if os.path.exists(QUOTES_FILE):
-            with open(QUOTES_FILE, "r") as f:
-                return json.load(f)
-        return ["Stay motivated!", "Keep going!"]
-
-    def load_favorites(self):
-        if os.path.exists(FAVORITES_FILE):
-            with open(FAVORITES_FILE, "r") as f:
-                return json.load(f)
-        return []
-
     def save_favorite(self):
-        if self.current_quote and self.current_quote not in self.favorites:
-            self.favorites.append(self.current_quote)
-            with open(FAVORITES_FILE, "w") as f:
-                json.dump(self.favorites, f, indent=2)
+        if self.book.add_favorite(self.current_quote):
             mb.showinfo("Saved", "Quote saved to favorites!")
         else:
             mb.showwarning("Warning", "Already in favorites or empty.")
@@ -81,46 +70,96 @@ class QuoteApp:
             mb.showinfo("Copied", "Quote copied to clipboard!")
 
     def show_favorites(self):
+        # Only one page of favorites is ever rendered, searching goes through the index
         top = Toplevel(self.root)
         top.title("⭐ Favorite Quotes")
-        top.geometry("500x400")
+        top.geometry("500x450")
+
+        search = ctk.CTkEntry(top, placeholder_text="Search text or author")
+        search.pack(fill="x", padx=10, pady=5)
+
         text = Text(top, wrap="word", font=("Arial", 12))
         text.pack(expand=True, fill="both")
-        text.insert("end", "\n\n".join(self.favorites))
-        text.config(state="disabled")
+
+        nav = ctk.CTkFrame(top)
+        nav.pack(pady=5)
+        page_label = ctk.CTkLabel(nav, text="")
+        state = {"page": 0, "positions": None}
+
+        def render():
+            positions = state["positions"]
+            total = len(self.favorites) if positions is None else len(positions)
+            pages = max(1, (total + FAVORITES_PAGE_SIZE - 1) // FAVORITES_PAGE_SIZE)
+            state["page"] = min(max(state["page"], 0), pages - 1)
+
+            text.config(state="normal")
+            text.delete("1.0", "end")
+            text.insert("end", "\n\n".join(self.favorites.page(state["page"], FAVORITES_PAGE_SIZE, positions)))
+            text.config(state="disabled")
+            page_label.configure(text=f"Page {state['page'] + 1} / {pages}  ({total} quotes)")
+
+        def turn(step):
+            state["page"] += step
+            render()
+
+        def on_search(event=None):
+            query = search.get().strip()
+            state["positions"] = self.favorites.search(query) if query else None
+            state["page"] = 0
+            render()
+
+        ctk.CTkButton(nav, text="◀ Prev", width=80, command=lambda: turn(-1)).grid(row=0, column=0, padx=10)
+        page_label.grid(row=0, column=1, padx=10)
+        ctk.CTkButton(nav, text="Next ▶", width=80, command=lambda: turn(1)).grid(row=0, column=2, padx=10)
+        search.bind("<KeyRelease>", on_search)
+        render()
 
     def new_quote(self):
-        try:
-            quote = self.fetch_online_quote()
-        except:
-            quote = random.choice(self.quotes)
-        self.current_quote = quote
+        self.current_quote = self.book.next_quote()
         self.quote_label.configure(text=self.current_quote)
-        self.save_last_quote()
 
-    def fetch_online_quote(self):
-        url = "https://zenquotes.io/api/random"
-        res = requests.get(url)
-        if res.status_code == 200:
-            data = res.json()[0]
-            return f"{data['q']} – {data['a']}"
-        raise Exception("API failed")
+    def load_daily_quote(self):
+        quote = self.book.daily_quote()
+        if quote is None:
+            self.new_quote()
+            source = "new"
+        else:
+            self.current_quote = quote
+            self.quote_label.configure(text=self.current_quote)
+            self.stats.record_serve("daily")
+            source = "daily"
+        self.stats.record_first_quote(time.perf_counter() - self.started, source)
+
+    def show_stats(self):
+        # Debug panel (F12): live pipeline counters, refreshed every second
+        top = Toplevel(self.root)
+        top.title("📈 Quote Pipeline Stats")
+        top.geometry("420x380")
+        text = Text(top, wrap="none", font=("Courier", 11))
+        text.pack(expand=True, fill="both")
+
+        timer = None
 
-    def save_last_quote(self):
-        today = str(datetime.date.today())
-        with open(LAST_QUOTE_FILE, "w") as f:
-            json.dump({"date": today, "quote": self.current_quote}, f)
+        def refresh():
+            nonlocal timer
+            text.config(state="normal")
+            text.delete("1.0", "end")
+            text.insert("end", json.dumps(self.stats.snapshot(), indent=2))
+            text.config(state="disabled")
+            timer = top.after(1000, refresh)
 
-    def load_daily_quote(self):
-        today = str(datetime.date.today())
-        if os.path.exists(LAST_QUOTE_FILE):
-            with open(LAST_QUOTE_FILE, "r") as f:
-                data = json.load(f)
-                if data["date"] == today:
-                    self.current_quote = data["quote"]
-                    self.quote_label.configure(text=self.current_quote)
-                    return
-        self.new_quote()
+        def close():
+            # Cancel the pending refresh, or it fires on a destroyed window
+            top.after_cancel(timer)
+            top.destroy()
+
+        def dump():
+            self.stats.dump(STATS_FILE)
+            mb.showinfo("Saved", f"Stats written to {STATS_FILE}")
+
+        ctk.CTkButton(top, text="💾 Dump JSON", command=dump).pack(pady=5)
+        top.protocol("WM_DELETE_WINDOW", close)
+        refresh()
 
     def schedule_refresh(self):
         now = datetime.datetime.now()
@@ -128,6 +167,11 @@ class QuoteApp:
         delay_ms = int((midnight - now).total_seconds() * 1000)
         self.root.after(delay_ms, self.new_quote)
 
+    def on_close(self):
+        self.fetcher.stop()
+        self.book.close()
+        self.root.destroy()
+
     def share_to_twitter(self):
         if self.current_quote:
             text = self.current_quote.replace(" ", "%20")
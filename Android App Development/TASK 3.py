@@ -7,33 +7,161 @@
 # or
 # pip install --upgrade pip 
 # pip install customtkinter playsound
+# Optional: pip install pygame (tones decoded once, played from memory, loop until dismissed)
 import customtkinter as ctk
 from tkinter import messagebox
-from datetime import datetime, timedelta
-import threading
-import time
+from datetime import datetime
 import json
-import os
+import queue
+import time
 from playsound import playsound
+from alarm_core import (AlarmBook, AlarmScheduler, AudioPool, TonePlayer, DEFAULT_TONE, TONES, in_memory_audio,
+                        latency_summary)  # Add tone1.mp3, tone2.mp3 etc. in the same directory
+
+EVENT_POLL_MS = 100  # How often the Tk main loop drains alarm events
+ALARM_ROWS = 8  # Switches the virtual alarm list keeps
+
+def alarm_text(alarm):
+    text = f"{alarm['time']} ({alarm['tone']})"
+    if alarm.get("repeat"):
+        text += f" 🔁 {alarm['repeat']}"
+    return text
+
+class AlarmSwitches:
+    # One CTkSwitch per alarm, created once and kept by alarm index, so an
+    # add, remove or state change only touches the switch it concerns.
+    def __init__(self, parent, alarms, on_toggle):
+        self.alarms = alarms
+        self.on_toggle = on_toggle
+        self.switches = {}
+        self.frame = ctk.CTkScrollableFrame(parent, width=450, height=250)
+
+    def render(self):
+        for index in range(len(self.alarms)):
+            if index not in self.switches:
+                self.add(index)
+
+    def add(self, index):
+        switch = ctk.CTkSwitch(self.frame, text="", command=lambda: self.on_toggle(index))
+        switch.pack(pady=5)
+        self.switches[index] = switch
+        self.update(index)
+
+    def update(self, index):
+        switch = self.switches.get(index)
+        if switch is not None:
+            alarm = self.alarms[index]
+            switch.configure(text=alarm_text(alarm))
+            switch.select() if alarm['active'] else switch.deselect()
+
+    def remove(self, index):
+        self.switches.pop(index).destroy()
+
+class VirtualAlarmList:
+    # A fixed pool of `height` switches re-filled from the alarm list on
+    # scroll: only the alarms in view have widgets, however many there are.
+    def __init__(self, parent, alarms, on_toggle, height=ALARM_ROWS):
+        self.alarms = alarms
+        self.on_toggle = on_toggle
+        self.height = height
+        self.offset = 0
+        self.frame = ctk.CTkFrame(parent, width=450, height=250)
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=height, sticky="ns")
+        self.slots = []
+        for slot in range(height):
+            switch = ctk.CTkSwitch(self.frame, text="", width=420,
+                                   command=lambda s=slot: self.on_toggle(self.offset + s))
+            switch.grid(row=slot, column=0, padx=10, pady=3, sticky="w")
+            self.slots.append(switch)
+        for widget in [self.frame] + self.slots:
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                widget.bind(sequence, self.on_wheel)
+
+    def render(self):
+        self.offset = max(0, min(self.offset, len(self.alarms) - self.height))
+        for slot in range(self.height):
+            self.fill(slot)
+        self.update_scrollbar()
+
+    def fill(self, slot):
+        switch = self.slots[slot]
+        index = self.offset + slot
+        if index >= len(self.alarms):
+            switch.grid_remove()
+            return
+        alarm = self.alarms[index]
+        switch.configure(text=alarm_text(alarm))
+        switch.select() if alarm['active'] else switch.deselect()
+        switch.grid()
+
+    def add(self, index):
+        if index < self.offset + self.height:
+            self.fill(index - self.offset)
+        self.update_scrollbar()
+
+    def update(self, index):
+        if 0 <= index - self.offset < self.height:
+            self.fill(index - self.offset)
+
+    def remove(self, index):
+        self.render()
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.alarms) - self.height))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
 
-ALARM_FILE = "alarms.json"
-DEFAULT_TONE = "tone1.mp3"  # Add tone1.mp3, tone2.mp3 etc. in the same directory
+    def update_scrollbar(self):
+        total = len(self.alarms)
+        if total <= self.height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.alarms)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.height)
+        else:
+            self.scroll_to(self.offset + (1 if float(amount) > 0 else -1))
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
 
 class AlarmClock:
-    def __init__(self, root):
+    def __init__(self, root, virtual=True):
         self.root = root
+        self.virtual = virtual
         self.root.title("⏰ Alarm Clock App")
         self.root.geometry("500x500")
         self.root.resizable(False, False)
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
 
-        self.alarms = self.load_alarms()
-        self.active_threads = []
+        self.book = AlarmBook()
+        self.alarms = self.book.alarms
+        # Worker threads never touch Tk: they post events that the main loop
+        # picks up in poll_events
+        self.events = queue.Queue()
+        if in_memory_audio():
+            # pip install pygame: decoded once, loops until Dismiss/Snooze
+            self.audio = TonePlayer()
+            self.audio.preload(TONES)
+        else:
+            self.audio = AudioPool(playsound, on_error=lambda tone, e: self.events.put(("error", f"Failed to play tone: {e}")))
 
         self.setup_ui()
         self.update_clock()
-        self.check_alarms_loop()
+        self.poll_events()
+        self.scheduler = AlarmScheduler(self.book, self.on_alarm)
+        self.root.bind("<F12>", lambda e: self.show_latency())
 
     def setup_ui(self):
         self.time_label = ctk.CTkLabel(self.root, text="", font=("DS-Digital", 40))
@@ -47,7 +175,7 @@ class AlarmClock:
         self.minute = ctk.CTkEntry(frame, width=50, placeholder_text="MM")
         self.ampm = ctk.CTkOptionMenu(frame, values=["AM", "PM"])
         self.ampm.set("AM")
-        self.tone = ctk.CTkOptionMenu(frame, values=["tone1.mp3", "tone2.mp3"])
+        self.tone = ctk.CTkOptionMenu(frame, values=TONES)
         self.tone.set(DEFAULT_TONE)
 
         self.hour.grid(row=0, column=0, padx=5)
@@ -57,10 +185,15 @@ class AlarmClock:
 
         ctk.CTkButton(frame, text="➕ Set Alarm", command=self.set_alarm).grid(row=0, column=4, padx=5)
 
+        # Optional: daily, weekdays, weekends, mon,wed,fri, every 90, every 2h or a cron rule
+        self.repeat = ctk.CTkEntry(frame, width=300, placeholder_text="Repeat (e.g. weekdays, every 2h) - blank for once")
+        self.repeat.grid(row=1, column=0, columnspan=5, pady=5)
+
         # Alarms List
-        self.alarm_list_frame = ctk.CTkScrollableFrame(self.root, width=450, height=250)
-        self.alarm_list_frame.pack(pady=20)
-        self.refresh_alarm_list()
+        rows = VirtualAlarmList if self.virtual else AlarmSwitches
+        self.alarm_list = rows(self.root, self.alarms, self.toggle_alarm)
+        self.alarm_list.frame.pack(pady=20)
+        self.alarm_list.render()
 
     def update_clock(self):
         now = datetime.now().strftime("%I:%M:%S %p\n%A, %d %B %Y")
@@ -68,59 +201,40 @@ class AlarmClock:
         self.root.after(1000, self.update_clock)
 
     def set_alarm(self):
-        h = self.hour.get().zfill(2)
-        m = self.minute.get().zfill(2)
-        ampm = self.ampm.get()
-        tone = self.tone.get()
-
-        if not (h.isdigit() and m.isdigit()):
-            messagebox.showerror("Invalid Input", "Please enter valid time.")
+        try:
+            self.book.add_alarm(self.hour.get(), self.minute.get(), self.ampm.get(), self.tone.get(), self.repeat.get())
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e))
             return
+        self.alarm_list.add(len(self.alarms) - 1)
 
-        alarm_time = f"{h}:{m} {ampm}"
-        self.alarms.append({"time": alarm_time, "tone": tone, "active": True})
-        self.save_alarms()
-        self.refresh_alarm_list()
+    def toggle_alarm(self, index):
+        self.book.toggle(index)
 
-    def refresh_alarm_list(self):
-        for widget in self.alarm_list_frame.winfo_children():
-            widget.destroy()
+    def on_alarm(self, index, alarm):
+        # Called on the scheduler thread the moment an alarm is due
+        self.events.put(("ring", (index, alarm, time.perf_counter())))
 
-        for index, alarm in enumerate(self.alarms):
-            text = f"{alarm['time']} ({alarm['tone']})"
-            switch = ctk.CTkSwitch(self.alarm_list_frame, text=text, command=lambda i=index: self.toggle_alarm(i))
-            switch.select() if alarm['active'] else switch.deselect()
-            switch.pack(pady=5)
+    def poll_events(self):
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "ring":
+                index, alarm, fired_at = value
+                # One-shot alarms were switched off when they fired
+                self.alarm_list.update(index)
+                self.ring_alarm(alarm["tone"], fired_at)
+            else:
+                messagebox.showerror("Sound Error", value)
+        self.root.after(EVENT_POLL_MS, self.poll_events)
 
-    def toggle_alarm(self, index):
-        self.alarms[index]['active'] = not self.alarms[index]['active']
-        self.save_alarms()
-
-    def save_alarms(self):
-        with open(ALARM_FILE, "w") as f:
-            json.dump(self.alarms, f, indent=2)
-
-    def load_alarms(self):
-        if os.path.exists(ALARM_FILE):
-            with open(ALARM_FILE, "r") as f:
-                return json.load(f)
-        return []
-
-    def check_alarms_loop(self):
-        def check():
-            while True:
-                now = datetime.now().strftime("%I:%M %p")
-                for alarm in self.alarms:
-                    if alarm["time"] == now and alarm["active"]:
-                        alarm["active"] = False  # Auto-disable
-                        self.save_alarms()
-                        threading.Thread(target=self.ring_alarm, args=(alarm["tone"],)).start()
-                time.sleep(30)
-
-        thread = threading.Thread(target=check, daemon=True)
-        thread.start()
-
-    def ring_alarm(self, tone):
+    def show_latency(self):
+        # Debug (F12): time from an alarm firing to its tone starting
+        messagebox.showinfo("Alarm-to-sound latency", json.dumps(latency_summary(self.audio.latencies), indent=2))
+
+    def ring_alarm(self, tone, fired_at=None):
         popup = ctk.CTkToplevel(self.root)
         popup.geometry("300x180")
         popup.title("🔔 Alarm!")
@@ -131,23 +245,29 @@ class AlarmClock:
         btn_frame = ctk.CTkFrame(popup)
         btn_frame.pack(pady=10)
 
+        try:
+            job = self.audio.submit(tone, fired_at)
+        except Exception as e:
+            job = None
+            messagebox.showerror("Sound Error", f"Failed to play tone: {e}")
+
+        def stop_tone():
+            if job is not None:
+                self.audio.cancel(job)
+
         def dismiss():
+            stop_tone()
             popup.destroy()
 
         def snooze():
-            new_time = (datetime.now() + timedelta(minutes=5)).strftime("%I:%M %p")
-            self.alarms.append({"time": new_time, "tone": tone, "active": True})
-            self.save_alarms()
-            self.refresh_alarm_list()
+            stop_tone()
+            self.book.snooze(tone)
+            self.alarm_list.add(len(self.alarms) - 1)
             popup.destroy()
 
         ctk.CTkButton(btn_frame, text="Dismiss", command=dismiss).grid(row=0, column=0, padx=10)
         ctk.CTkButton(btn_frame, text="Snooze 5 min", command=snooze).grid(row=0, column=1, padx=10)
-
-        try:
-            playsound(tone)
-        except Exception as e:
-            messagebox.showerror("Sound Error", f"Failed to play tone: {e}")
+        popup.protocol("WM_DELETE_WINDOW", dismiss)
 
 if __name__ == "__main__":
     root = ctk.CTk()
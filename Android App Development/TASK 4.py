@@ -8,12 +8,12 @@
 # pip install --upgrade pip
 # Required Installation (Run this first in terminal):
 import customtkinter as ctk
+import time
 from tkinter import messagebox
-import json
-import random
-import os
+from quiz_core import QuizBank
+from quiz_history import AttemptStore, attempt_analytics
 
-QUIZ_FILE = "quizzes.json"  # You can define multiple quizzes here
+GENERATED_SIZE = 20  # Questions in a generated quiz unless another count is given
 
 class QuizApp:
     def __init__(self, root):
@@ -25,96 +25,134 @@ class QuizApp:
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
 
-        self.quiz_data = self.load_quizzes()
-        self.selected_quiz = None
-        self.question_index = 0
-        self.score = 0
-        self.user_answers = []
+        self.bank = QuizBank()
+        self.session = None
+        self.history = AttemptStore()  # Every answer, kept across sessions
+        self.question_started = 0.0
+
+        # Each screen is built once and shown/hidden; moving between questions
+        # only reconfigures the widgets already there
+        self.build_menu()
+        self.build_question_screen()
+        self.build_result_screen()
+        self.build_stats_screen()
+        self.screen = None
 
         self.main_menu()
 
-    def load_quizzes(self):
-        if os.path.exists(QUIZ_FILE):
-            with open(QUIZ_FILE, "r") as f:
-                return json.load(f)
-        else:
-            return {
-                "General Knowledge": [
-                    {
-                        "question": "What is the capital of France?",
-                        "options": ["Berlin", "Madrid", "Paris", "Lisbon"],
-                        "answer": "Paris"
-                    },
-                    {
-                        "question": "Who wrote 'Romeo and Juliet'?",
-                        "options": ["Charles Dickens", "William Shakespeare", "Jane Austen", "Leo Tolstoy"],
-                        "answer": "William Shakespeare"
-                    }
-                ],
-                "Science": [
-                    {
-                        "question": "What is the chemical symbol for water?",
-                        "options": ["H2O", "O2", "CO2", "NaCl"],
-                        "answer": "H2O"
-                    },
-                    {
-                        "question": "Which planet is known as the Red Planet?",
-                        "options": ["Venus", "Earth", "Mars", "Saturn"],
-                        "answer": "Mars"
-                    }
-                ]
-            }
+    def show_screen(self, screen):
+        if self.screen is not None:
+            self.screen.pack_forget()
+        self.screen = screen
+        screen.pack(expand=True, fill="both")
 
-    def main_menu(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def build_menu(self):
+        self.menu_screen = ctk.CTkFrame(self.root, fg_color="transparent")
 
-        title = ctk.CTkLabel(self.root, text="🧠 Quiz App", font=("Arial", 28))
+        title = ctk.CTkLabel(self.menu_screen, text="🧠 Quiz App", font=("Arial", 28))
         title.pack(pady=20)
 
-        subtitle = ctk.CTkLabel(self.root, text="Select a Quiz", font=("Arial", 16))
+        subtitle = ctk.CTkLabel(self.menu_screen, text="Select a Quiz", font=("Arial", 16))
         subtitle.pack(pady=10)
 
-        for quiz_title in self.quiz_data:
-            btn = ctk.CTkButton(self.root, text=quiz_title, command=lambda qt=quiz_title: self.start_quiz(qt))
+        for quiz_title in self.bank.titles():
+            btn = ctk.CTkButton(self.menu_screen, text=quiz_title, command=lambda qt=quiz_title: self.start_quiz(qt))
             btn.pack(pady=5)
 
-        ctk.CTkButton(self.root, text="🎲 Random Quiz", command=self.start_random_quiz).pack(pady=15)
+        ctk.CTkButton(self.menu_screen, text="🎲 Random Quiz", command=self.start_random_quiz).pack(pady=15)
+
+        # Generated quiz: N questions sampled across all quizzes
+        generate_frame = ctk.CTkFrame(self.menu_screen, fg_color="transparent")
+        generate_frame.pack(pady=5)
+        self.generate_count = ctk.CTkEntry(generate_frame, width=50, placeholder_text=str(GENERATED_SIZE))
+        self.generate_count.grid(row=0, column=0, padx=5)
+        self.generate_filters = ctk.CTkEntry(generate_frame, width=260, placeholder_text="tag:history difficulty:easy")
+        self.generate_filters.grid(row=0, column=1, padx=5)
+        ctk.CTkButton(generate_frame, text="✨ Generate Quiz", command=self.start_generated_quiz).grid(row=0, column=2, padx=5)
+
+        ctk.CTkButton(self.menu_screen, text="📈 Statistics", command=self.show_stats).pack(pady=15)
+
+    def build_question_screen(self):
+        self.question_screen = ctk.CTkFrame(self.root, fg_color="transparent")
+        self.progress_label = ctk.CTkLabel(self.question_screen, text="", font=("Arial", 16))
+        self.progress_label.pack(pady=10)
+        self.question_label = ctk.CTkLabel(self.question_screen, text="", font=("Arial", 18), wraplength=500)
+        self.question_label.pack(pady=20)
+
+        self.selected_option = ctk.StringVar()
+        self.options_frame = ctk.CTkFrame(self.question_screen, fg_color="transparent")
+        self.options_frame.pack(anchor="w", padx=80)
+        self.option_buttons = []  # Grows to the most options any question had
+
+        ctk.CTkButton(self.question_screen, text="Submit Answer", command=self.check_answer).pack(pady=20)
+
+    def build_result_screen(self):
+        self.result_screen = ctk.CTkFrame(self.root, fg_color="transparent")
+        ctk.CTkLabel(self.result_screen, text="📊 Quiz Result", font=("Arial", 22)).pack(pady=20)
+        self.score_label = ctk.CTkLabel(self.result_screen, text="", font=("Arial", 18))
+        self.score_label.pack(pady=10)
+
+        self.result_frame = ctk.CTkScrollableFrame(self.result_screen, width=500, height=250)
+        self.result_frame.pack(pady=15)
+        self.result_labels = []  # Reused across results, grows to the longest quiz
+
+        ctk.CTkButton(self.result_screen, text="🏠 Home", command=self.main_menu).pack(pady=20)
+
+    def build_stats_screen(self):
+        self.stats_screen = ctk.CTkFrame(self.root, fg_color="transparent")
+        ctk.CTkLabel(self.stats_screen, text="📈 Statistics", font=("Arial", 22)).pack(pady=15)
+        self.stats_text = ctk.CTkTextbox(self.stats_screen, width=540, height=330, wrap="word")
+        self.stats_text.pack(pady=5)
+        ctk.CTkButton(self.stats_screen, text="🏠 Home", command=self.main_menu).pack(pady=15)
+
+    def main_menu(self):
+        self.show_screen(self.menu_screen)
 
     def start_quiz(self, title):
-        self.selected_quiz = self.quiz_data[title]
-        self.current_title = title
-        self.question_index = 0
-        self.score = 0
-        self.user_answers = []
+        self.session = self.bank.start(title)
+        self.show_screen(self.question_screen)
         self.show_question()
 
     def start_random_quiz(self):
-        title = random.choice(list(self.quiz_data.keys()))
-        self.start_quiz(title)
+        self.start_quiz(self.bank.random_title())
 
-    def show_question(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def start_generated_quiz(self):
+        count = self.generate_count.get().strip() or str(GENERATED_SIZE)
+        if not count.isdigit() or int(count) < 1:
+            messagebox.showerror("Invalid Input", "Enter how many questions to generate.")
+            return
+        try:
+            self.session = self.bank.generate(int(count), self.generate_filters.get())
+        except ValueError as e:
+            messagebox.showerror("Generated Quiz", str(e))
+            return
+        self.show_screen(self.question_screen)
+        self.show_question()
 
-        if self.question_index >= len(self.selected_quiz):
+    def show_question(self):
+        session = self.session
+        if session.finished():
             self.show_result()
             return
 
-        question = self.selected_quiz[self.question_index]
+        question = session.current()
         q_text = question["question"]
         options = question["options"]
 
-        ctk.CTkLabel(self.root, text=f"{self.current_title} - Question {self.question_index+1}/{len(self.selected_quiz)}", font=("Arial", 16)).pack(pady=10)
-        ctk.CTkLabel(self.root, text=q_text, font=("Arial", 18), wraplength=500).pack(pady=20)
-
-        self.selected_option = ctk.StringVar()
-
-        for opt in options:
-            btn = ctk.CTkRadioButton(self.root, text=opt, variable=self.selected_option, value=opt)
-            btn.pack(anchor="w", padx=80, pady=5)
-
-        ctk.CTkButton(self.root, text="Submit Answer", command=self.check_answer).pack(pady=20)
+        self.progress_label.configure(text=f"{session.title} - Question {session.question_index+1}/{session.total()}")
+        self.question_label.configure(text=q_text)
+        self.selected_option.set("")
+        self.question_started = time.perf_counter()
+
+        while len(self.option_buttons) < len(options):
+            btn = ctk.CTkRadioButton(self.options_frame, text="", variable=self.selected_option, value="")
+            self.option_buttons.append(btn)
+        for row, btn in enumerate(self.option_buttons):
+            if row < len(options):
+                btn.configure(text=options[row], value=options[row])
+                btn.grid(row=row, column=0, sticky="w", pady=5)
+            else:
+                btn.grid_remove()
 
     def check_answer(self):
         selected = self.selected_option.get()
@@ -122,36 +160,48 @@ class QuizApp:
             messagebox.showwarning("No selection", "Please select an option.")
             return
 
-        correct = self.selected_quiz[self.question_index]["answer"]
-        if selected == correct:
-            self.score += 1
+        self.history.record(self.session.current(), selected, time.perf_counter() - self.question_started)
+        self.history.flush()
+        is_correct, correct = self.session.answer(selected)
+        if is_correct:
             feedback = "✅ Correct!"
         else:
             feedback = f"❌ Incorrect! Correct: {correct}"
 
-        self.user_answers.append({"question": self.selected_quiz[self.question_index]["question"],
-                                  "your_answer": selected, "correct_answer": correct})
-
-        self.question_index += 1
-
         messagebox.showinfo("Feedback", feedback)
         self.show_question()
 
     def show_result(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
-        ctk.CTkLabel(self.root, text="📊 Quiz Result", font=("Arial", 22)).pack(pady=20)
-        ctk.CTkLabel(self.root, text=f"Your Score: {self.score} / {len(self.selected_quiz)}", font=("Arial", 18)).pack(pady=10)
-
-        result_frame = ctk.CTkScrollableFrame(self.root, width=500, height=250)
-        result_frame.pack(pady=15)
-
-        for qa in self.user_answers:
-            q_label = ctk.CTkLabel(result_frame, text=f"Q: {qa['question']}\nYour Answer: {qa['your_answer']}\nCorrect Answer: {qa['correct_answer']}", anchor="w", justify="left", wraplength=480)
-            q_label.pack(pady=5)
-
-        ctk.CTkButton(self.root, text="🏠 Home", command=self.main_menu).pack(pady=20)
+        self.score_label.configure(text=f"Your Score: {self.session.score} / {self.session.total()}")
+
+        answers = self.session.user_answers
+        while len(self.result_labels) < len(answers):
+            label = ctk.CTkLabel(self.result_frame, text="", anchor="w", justify="left", wraplength=480)
+            self.result_labels.append(label)
+        for row, label in enumerate(self.result_labels):
+            if row < len(answers):
+                qa = answers[row]
+                label.configure(text=f"Q: {qa['question']}\nYour Answer: {qa['your_answer']}\nCorrect Answer: {qa['correct_answer']}")
+                label.grid(row=row, column=0, sticky="w", pady=5)
+            else:
+                label.grid_remove()
+
+        self.show_screen(self.result_screen)
+
+    def show_stats(self):
+        stats = attempt_analytics(self.history)
+        lines = [f"Answers recorded: {stats['answers']}", "", "Accuracy by user:"]
+        lines += [f"  {user}: {accuracy:.0%}" for user, accuracy in stats["users"].items()]
+        lines += ["", "Hardest questions:"]
+        for q in stats["hardest"]:
+            lines.append(f"• {q['question']}  ({q['accuracy']:.0%} correct of {q['attempts']})")
+            lines += [f"    {option}: {rate:.0%}{'  ✅' if option == q['answer'] else ''}"
+                      for option, rate in q["option_rates"].items()]
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete("1.0", "end")
+        self.stats_text.insert("end", "\n".join(lines))
+        self.stats_text.configure(state="disabled")
+        self.show_screen(self.stats_screen)
 
 if __name__ == "__main__":
     root = ctk.CTk()
@@ -164,6 +214,9 @@ if __name__ == "__main__":
 # options.
 # The application features a user-friendly interface with buttons for navigation and feedback on answers.
 # Ensure you have the required files (quizzes.json) in the same directory as this script.
+# For very large banks, run quiz_core.convert_quizzes_to_shards() once: the app then reads only
+# quizzes/manifest.json at startup and loads each quiz's questions when it is started. Edits to
+# quizzes.json are picked up: the bank is re-sharded on the next start.
 # You can run this script to launch the application.
 # You can add more quizzes by updating the `quizzes.json` file with new questions and   
 # options.
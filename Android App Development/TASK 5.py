@@ -12,10 +12,8 @@
 # The application features a login system for both students and instructors, with registration functionality.
 # The UI includes buttons for navigation, input fields for course management, and attendance marking.
 import customtkinter as ctk
-import sqlite3
 from tkinter import messagebox
-
-DB_NAME = "university.db"
+from attendance_core import AttendanceDB
 
 class AttendanceApp:
     def __init__(self, root):
@@ -26,50 +24,17 @@ class AttendanceApp:
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
 
-        self.init_db()
+        self.db = AttendanceDB()
         self.user_role = None
         self.user_id = None
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.login_screen()
 
     # ---------------- DATABASE ----------------
-    def init_db(self):
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE,
-                password TEXT,
-                role TEXT CHECK(role IN ('student', 'instructor'))
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS courses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                instructor_id INTEGER
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id INTEGER,
-                course_id INTEGER,
-                date TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
-
-    def execute(self, query, params=(), fetch=False):
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        data = cursor.fetchall() if fetch else None
-        conn.close()
-        return data
+    def on_close(self):
+        self.db.close()
+        self.root.destroy()
 
     # ---------------- LOGIN & REGISTRATION ----------------
     def login_screen(self):
@@ -95,9 +60,9 @@ class AttendanceApp:
         pwd = self.password.get().strip()
         role = self.role.get()
 
-        result = self.execute("SELECT id FROM users WHERE username=? AND password=? AND role=?", (uname, pwd, role), True)
-        if result:
-            self.user_id = result[0][0]
+        user_id = self.db.login(uname, pwd, role)
+        if user_id is not None:
+            self.user_id = user_id
             self.user_role = role
             if role == "student":
                 self.student_dashboard()
@@ -111,10 +76,9 @@ class AttendanceApp:
         pwd = self.password.get().strip()
         role = self.role.get()
 
-        try:
-            self.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", (uname, pwd, role))
+        if self.db.register(uname, pwd, role):
             messagebox.showinfo("Success", "Registered successfully!")
-        except sqlite3.IntegrityError:
+        else:
             messagebox.showerror("Error", "Username already exists!")
 
     # ---------------- STUDENT PANEL ----------------
@@ -122,7 +86,7 @@ class AttendanceApp:
         self.clear_screen()
         ctk.CTkLabel(self.root, text="📚 Student Dashboard", font=("Arial", 20)).pack(pady=10)
 
-        courses = self.execute("SELECT id, name FROM courses", fetch=True)
+        courses = self.db.all_courses()
         for cid, cname in courses:
             btn = ctk.CTkButton(self.root, text=cname, command=lambda c=cid: self.mark_attendance(c))
             btn.pack(pady=5)
@@ -130,18 +94,10 @@ class AttendanceApp:
         ctk.CTkButton(self.root, text="🔙 Logout", command=self.login_screen).pack(pady=20)
 
     def mark_attendance(self, course_id):
-        from datetime import date
-        today = str(date.today())
-
-        # Check if already marked
-        check = self.execute("SELECT * FROM attendance WHERE student_id=? AND course_id=? AND date=?", 
-                             (self.user_id, course_id, today), fetch=True)
-        if check:
-            messagebox.showinfo("Already Marked", "You have already marked attendance today.")
-        else:
-            self.execute("INSERT INTO attendance (student_id, course_id, date) VALUES (?, ?, ?)", 
-                         (self.user_id, course_id, today))
+        if self.db.mark_attendance(self.user_id, course_id):
             messagebox.showinfo("Success", "Attendance marked!")
+        else:
+            messagebox.showinfo("Already Marked", "You have already marked attendance today.")
 
     # ---------------- INSTRUCTOR PANEL ----------------
     def instructor_dashboard(self):
@@ -153,7 +109,7 @@ class AttendanceApp:
 
         ctk.CTkButton(self.root, text="➕ Add Course", command=self.add_course).pack(pady=5)
 
-        courses = self.execute("SELECT id, name FROM courses WHERE instructor_id=?", (self.user_id,), fetch=True)
+        courses = self.db.instructor_courses(self.user_id)
         for cid, cname in courses:
             btn = ctk.CTkButton(self.root, text=f"📖 {cname}", command=lambda c=cid: self.view_attendance(c))
             btn.pack(pady=5)
@@ -165,7 +121,7 @@ class AttendanceApp:
         if not name:
             messagebox.showerror("Error", "Course name cannot be empty.")
             return
-        self.execute("INSERT INTO courses (name, instructor_id) VALUES (?, ?)", (name, self.user_id))
+        self.db.add_course(name, self.user_id)
         messagebox.showinfo("Success", "Course added!")
         self.instructor_dashboard()
 
@@ -173,12 +129,7 @@ class AttendanceApp:
         self.clear_screen()
 
         ctk.CTkLabel(self.root, text="📊 Attendance Report", font=("Arial", 18)).pack(pady=10)
-        results = self.execute("""
-            SELECT u.username, a.date FROM attendance a
-            JOIN users u ON u.id = a.student_id
-            WHERE a.course_id=?
-            ORDER BY a.date DESC
-        """, (course_id,), fetch=True)
+        results = self.db.attendance_report(course_id)
 
         if not results:
             ctk.CTkLabel(self.root, text="No attendance records yet.").pack(pady=10)
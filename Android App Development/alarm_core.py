@@ -0,0 +1,397 @@
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from datetime import datetime, timedelta
+from due_queue import DueQueue
+from persistence import writer
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+ALARM_FILE = "alarms.json"
+DEFAULT_TONE = "tone1.mp3"
+TONES = ["tone1.mp3", "tone2.mp3"]
+SNOOZE_MINUTES = 5
+MAX_SLEEP = 60  # Re-check the wall clock at least this often (seconds), for clock changes
+AUDIO_WORKERS = 2  # Tones playing at once; more simultaneous alarms wait their turn
+TONE_CACHE_SIZE = 4  # Decoded tones kept in memory
+RING_SECONDS = 60  # A looping tone stops by itself after this long
+LATENCY_SAMPLES = 100  # Alarm-to-sound latencies kept for the summary
+ONE_MINUTE = timedelta(minutes=1)
+ONE_DAY = timedelta(days=1)
+DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]  # Cron numbering, sun = 0 (or 7)
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+REPEAT_PRESETS = {"daily": "sun-sat", "weekdays": "mon-fri", "weekends": "sat,sun"}
+INTERVAL_ANCHOR = datetime(2000, 1, 1)  # "every N" counts from the alarm time on this day
+CRON_SEARCH_DAYS = 366 * 8  # Covers Feb 29 rules; anything rarer never fires
+
+
+@lru_cache(maxsize=4096)  # Only 1440 distinct alarm times a day, strptime is slow
+def alarm_time_on(text, day):
+    parsed = datetime.strptime(text, "%I:%M %p")
+    return datetime(day.year, day.month, day.day, parsed.hour, parsed.minute)
+
+
+def parse_cron_field(field, low, high, names=()):
+    # "*", "5", "1-5", "*/15", "mon-fri", "1,15,30" ... -> sorted values
+    def value(token):
+        if token in names:
+            return names.index(token) + low
+        if not token:
+            raise ValueError(f"'{field}' has an empty value (e.g. a dangling '-' or '/').")
+        if not token.isdigit():
+            raise ValueError(f"'{token}' is not a valid value.")
+        return int(token)
+
+    values = set()
+    for part in field.lower().split(","):
+        spec, slash, step = part.partition("/")
+        if spec == "*":
+            start, end = low, high
+        else:
+            first, dash, last = spec.partition("-")
+            start = value(first)
+            end = value(last) if dash else start
+        step = value(step) if slash else 1
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"'{part}' is out of range {low}-{high}.")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+def cron_rule(expression):
+    # Standard 5-field cron: minute hour day-of-month month day-of-week. As in
+    # cron, when both day fields are restricted a day matching either counts.
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError("Cron rules need 5 fields: minute hour day month weekday.")
+    minutes = parse_cron_field(fields[0], 0, 59)
+    hours = parse_cron_field(fields[1], 0, 23)
+    days = set(parse_cron_field(fields[2], 1, 31))
+    months = set(parse_cron_field(fields[3], 1, 12, MONTH_NAMES))
+    weekdays = {d % 7 for d in parse_cron_field(fields[4], 0, 7, DAY_NAMES)}
+    day_any, weekday_any = fields[2] == "*", fields[4] == "*"
+    times = [(h, m) for h in hours for m in minutes]
+
+    def day_matches(day):
+        if day.month not in months:
+            return False
+        in_month, in_week = day.day in days, (day.weekday() + 1) % 7 in weekdays
+        if day_any or weekday_any:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_at(after):
+        day = after.date()
+        i = bisect.bisect_left(times, (after.hour, after.minute))
+        for _ in range(CRON_SEARCH_DAYS):
+            if day_matches(day) and i < len(times):
+                h, m = times[i]
+                return datetime(day.year, day.month, day.day, h, m)
+            day += ONE_DAY
+            i = 0
+        return None
+    return next_at
+
+
+def interval_rule(time_text, minutes):
+    if minutes < 1:
+        raise ValueError("Repeat interval must be at least 1 minute.")
+    step = timedelta(minutes=minutes)
+    anchor = alarm_time_on(time_text, INTERVAL_ANCHOR.date())
+
+    def next_at(after):
+        return anchor + -((anchor - after) // step) * step  # Ceil to the next step
+    return next_at
+
+
+@lru_cache(maxsize=4096)
+def compile_rule(time_text, repeat):
+    # Turns an alarm's repeat text into next_at(after) -> first fire time at
+    # or after `after` (None if never). Compiled once per distinct rule.
+    #   "daily", "weekdays", "weekends", "mon,wed,fri", "tue-thu"  at the alarm time
+    #   "every 90" / "every 90m" / "every 2h"                      from the alarm time
+    #   "*/30 9-17 * * mon-fri"                                    cron, replaces the time
+    text = " ".join(repeat.lower().split())
+    text = REPEAT_PRESETS.get(text, text)
+    try:
+        if text.startswith("every "):
+            amount = text[6:]
+            factor = 60 if amount.endswith("h") else 1
+            if not amount.rstrip("hm").isdigit():
+                raise ValueError("use e.g. 'every 90' or 'every 2h'.")
+            return interval_rule(time_text, int(amount.rstrip("hm")) * factor)
+        if len(text.split()) == 5:
+            return cron_rule(text)
+        at = alarm_time_on(time_text, INTERVAL_ANCHOR.date())
+        return cron_rule(f"{at.minute} {at.hour} * * {text.replace(' ', '')}")
+    except ValueError as e:
+        raise ValueError(f"Invalid repeat rule '{repeat}': {e}")
+
+
+def next_fire_time(alarm, now):
+    # Next time the alarm comes round; an alarm whose minute is still
+    # running fires right away, like the old once-a-minute match did.
+    # None for alarms that can never fire (e.g. a hand-edited "25:00 AM").
+    try:
+        if alarm.get("repeat"):
+            return compile_rule(alarm["time"], alarm["repeat"])(now.replace(second=0, microsecond=0))
+        fire_at = alarm_time_on(alarm["time"], now.date())
+    except ValueError:
+        return None
+    if fire_at + ONE_MINUTE <= now:
+        fire_at += ONE_DAY
+    return fire_at
+
+
+class AlarmQueue(DueQueue):
+    # Fire times of the active alarms, keyed by index in the alarm list.
+    def build(self, alarms, now):
+        fire_times = ((next_fire_time(alarm, now) if alarm["active"] else None, index)
+                      for index, alarm in enumerate(alarms))
+        self.reset((fire_at, index) for fire_at, index in fire_times if fire_at is not None)
+
+    def schedule(self, index, alarm, now):
+        self.cancel(index)
+        fire_at = next_fire_time(alarm, now) if alarm["active"] else None
+        if fire_at is not None:
+            return self.push(index, fire_at)
+
+
+class AlarmBook:
+    # UI-free alarm model behind AlarmClock: the alarm list and which alarms
+    # are due at a given time. Shared with the scheduler thread, so every
+    # change happens under `cond` and wakes the scheduler to re-arm. A stored
+    # alarm dict is never changed in place, only replaced, so a save is a copy
+    # of the list alone.
+    def __init__(self, alarm_file=ALARM_FILE):
+        self.alarm_file = alarm_file
+        self.cond = threading.Condition()
+        self.alarms = self.load_alarms()
+        self.queue = AlarmQueue()
+        self.queue.build(self.alarms, datetime.now())
+
+    def load_alarms(self):
+        if os.path.exists(self.alarm_file):
+            with open(self.alarm_file, "r") as f:
+                return json.load(f)
+        return []
+
+    def save_alarms(self):
+        # The copy is taken on the writer thread, once per burst of saves
+        writer.save(self.alarm_file, self.snapshot)
+
+    def snapshot(self):
+        with self.cond:
+            return list(self.alarms)
+
+    def rearm(self, index, now=None):
+        entry = self.queue.schedule(index, self.alarms[index], now or datetime.now())
+        # The scheduler only needs waking when the earliest alarm moved up; if
+        # a cancelled alarm was the earliest it wakes, finds nothing and re-waits
+        if entry is not None and self.queue.heap[0] is entry:
+            self.cond.notify_all()
+
+    def add_alarm(self, hour, minute, ampm, tone=DEFAULT_TONE, repeat=""):
+        h = hour.zfill(2)
+        m = minute.zfill(2)
+        if not (h.isdigit() and m.isdigit()):
+            raise ValueError("Please enter valid time.")
+
+        alarm = {"time": f"{h}:{m} {ampm}", "tone": tone, "active": True}
+        try:
+            alarm_time_on(alarm["time"], INTERVAL_ANCHOR.date())
+        except ValueError:
+            raise ValueError("Please enter valid time.")
+        if repeat.strip():
+            compile_rule(alarm["time"], repeat)  # Raises ValueError for a bad rule
+            alarm["repeat"] = repeat.strip()
+        with self.cond:
+            self.alarms.append(alarm)
+            self.rearm(len(self.alarms) - 1)
+            self.save_alarms()
+        return alarm
+
+    def toggle(self, index):
+        with self.cond:
+            alarm = self.alarms[index]
+            self.alarms[index] = dict(alarm, active=not alarm["active"])
+            self.rearm(index)
+            self.save_alarms()
+
+    def next_time(self):
+        with self.cond:
+            return self.queue.next_time()
+
+    def due_alarms(self, now=None):
+        now = now or datetime.now()
+        with self.cond:
+            due = []
+            changed = False
+            for index in self.queue.pop_due(now):
+                alarm = self.alarms[index]
+                if alarm.get("repeat"):
+                    # Computed once per ring, never per tick
+                    self.queue.schedule(index, alarm, now.replace(second=0, microsecond=0) + ONE_MINUTE)
+                else:
+                    alarm = dict(alarm, active=False)  # Auto-disable
+                    self.alarms[index] = alarm
+                    changed = True
+                due.append((index, alarm))
+            if changed:
+                self.save_alarms()
+        return due
+
+    def snooze(self, tone, minutes=SNOOZE_MINUTES, now=None):
+        now = now or datetime.now()
+        new_time = (now + timedelta(minutes=minutes)).strftime("%I:%M %p")
+        alarm = {"time": new_time, "tone": tone, "active": True}
+        with self.cond:
+            self.alarms.append(alarm)
+            self.rearm(len(self.alarms) - 1, now)
+            self.save_alarms()
+        return alarm
+
+
+class AlarmScheduler:
+    # Background thread that sleeps on the book's condition until the earliest
+    # alarm is due (or an add/toggle/snooze re-arms it), then hands each due
+    # alarm to on_fire(index, alarm). on_fire runs on this thread, outside the
+    # lock.
+    def __init__(self, book, on_fire):
+        self.book = book
+        self.on_fire = on_fire
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            with self.book.cond:
+                while self.running:
+                    next_time = self.book.queue.next_time()
+                    now = datetime.now()
+                    if next_time is not None and next_time <= now:
+                        break
+                    wait = MAX_SLEEP if next_time is None else (next_time - now).total_seconds()
+                    self.book.cond.wait(min(wait, MAX_SLEEP))
+                if not self.running:
+                    return
+                due = self.book.due_alarms(now)
+            for index, alarm in due:
+                self.on_fire(index, alarm)
+
+    def stop(self):
+        with self.book.cond:
+            self.running = False
+            self.book.cond.notify_all()
+
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0}
+    return {"count": len(ordered),
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1)}
+
+
+class AudioPool:
+    # Fixed set of daemon threads playing tones, so however many alarms fire
+    # at once the thread count stays at `workers`. submit() returns an Event;
+    # setting it (Dismiss/Snooze) drops the tone if it hasn't started yet.
+    def __init__(self, play, workers=AUDIO_WORKERS, on_error=None):
+        self.play = play
+        self.on_error = on_error
+        self.jobs = queue.Queue()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        for _ in range(workers):
+            threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, tone, fired_at=None):
+        cancelled = threading.Event()
+        self.jobs.put((tone, cancelled, fired_at or time.perf_counter()))
+        return cancelled
+
+    def cancel(self, job):
+        job.set()
+
+    def run(self):
+        while True:
+            tone, cancelled, fired_at = self.jobs.get()
+            if cancelled.is_set():
+                continue
+            # Includes the file decode playsound does on every ring
+            self.latencies.append(time.perf_counter() - fired_at)
+            try:
+                self.play(tone)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(tone, e)
+
+
+def in_memory_audio():
+    # pygame being importable isn't enough: mixer.init() raises pygame.error
+    # when there is no audio device, and playsound is the fallback then
+    if pygame is None:
+        return False
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        return False
+    return True
+
+
+class TonePlayer:
+    # Plays tones from memory: each tone file is decoded once into a PCM
+    # buffer (a pygame Sound) and kept in an LRU of `cache_size` tones. A ring
+    # loops until cancel() stops its channel, which is immediate, or until
+    # RING_SECONDS pass. Same submit/cancel interface as AudioPool.
+    def __init__(self, cache_size=TONE_CACHE_SIZE, decode=None):
+        if decode is None:
+            pygame.mixer.init()
+            decode = pygame.mixer.Sound
+        self.decode = decode
+        self.cache_size = cache_size
+        self.sounds = OrderedDict()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def preload(self, tones):
+        # Decode in the background so the first ring doesn't pay for it
+        def load():
+            for tone in tones:
+                try:
+                    self.sound(tone)
+                except Exception:
+                    pass  # Reported when the tone is actually played
+        threading.Thread(target=load, daemon=True).start()
+
+    def sound(self, tone):
+        with self.lock:
+            if tone in self.sounds:
+                self.sounds.move_to_end(tone)
+                return self.sounds[tone]
+            sound = self.decode(tone)
+            self.sounds[tone] = sound
+            if len(self.sounds) > self.cache_size:
+                self.sounds.popitem(last=False)
+            return sound
+
+    def submit(self, tone, fired_at=None):
+        fired_at = fired_at or time.perf_counter()
+        channel = self.sound(tone).play(loops=-1, maxtime=RING_SECONDS * 1000)
+        self.latencies.append(time.perf_counter() - fired_at)
+        return channel
+
+    def cancel(self, job):
+        if job is not None:  # None when every mixer channel was busy
+            job.stop()
@@ -0,0 +1,105 @@
+import sqlite3
+from datetime import date
+
+DB_NAME = "university.db"
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",  # Readers don't block the writer and vice versa
+    "PRAGMA synchronous=NORMAL",  # Safe with WAL, fsyncs only at checkpoints
+    "PRAGMA cache_size=-8000",  # 8 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",  # Wait for another app instance's write instead of failing
+]
+
+
+class AttendanceDB:
+    # UI-free data layer behind AttendanceApp: users, courses and attendance.
+    # One long-lived connection in WAL mode; statements are prepared once and
+    # reused from the connection's statement cache (sqlite3's default of 128
+    # covers every query here). Reads never commit, each write is its own
+    # transaction.
+    def __init__(self, db_name=DB_NAME):
+        self.db_name = db_name
+        self.conn = sqlite3.connect(db_name)
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+        self.init_db()
+
+    def init_db(self):
+        conn = self.conn
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE,
+                password TEXT,
+                role TEXT CHECK(role IN ('student', 'instructor'))
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS courses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                instructor_id INTEGER
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER,
+                course_id INTEGER,
+                date TEXT
+            )
+        """)
+        conn.commit()
+
+    def execute(self, query, params=(), fetch=False):
+        if fetch:
+            return self.conn.execute(query, params).fetchall()
+        with self.conn:  # Commits, or rolls back if the statement fails
+            self.conn.execute(query, params)
+        return None
+
+    def close(self):
+        self.conn.close()
+
+    # ---------------- USERS ----------------
+    def login(self, username, password, role):
+        result = self.execute("SELECT id FROM users WHERE username=? AND password=? AND role=?",
+                              (username, password, role), True)
+        return result[0][0] if result else None
+
+    def register(self, username, password, role):
+        try:
+            self.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", (username, password, role))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    # ---------------- COURSES & ATTENDANCE ----------------
+    def all_courses(self):
+        return self.execute("SELECT id, name FROM courses", fetch=True)
+
+    def instructor_courses(self, instructor_id):
+        return self.execute("SELECT id, name FROM courses WHERE instructor_id=?", (instructor_id,), fetch=True)
+
+    def add_course(self, name, instructor_id):
+        self.execute("INSERT INTO courses (name, instructor_id) VALUES (?, ?)", (name, instructor_id))
+
+    def mark_attendance(self, student_id, course_id, day=None):
+        # Returns False when the student already marked attendance that day
+        day = day or str(date.today())
+        check = self.execute("SELECT * FROM attendance WHERE student_id=? AND course_id=? AND date=?",
+                             (student_id, course_id, day), fetch=True)
+        if check:
+            return False
+        self.execute("INSERT INTO attendance (student_id, course_id, date) VALUES (?, ?, ?)",
+                     (student_id, course_id, day))
+        return True
+
+    def attendance_report(self, course_id):
+        return self.execute("""
+            SELECT u.username, a.date FROM attendance a
+            JOIN users u ON u.id = a.student_id
+            WHERE a.course_id=?
+            ORDER BY a.date DESC
+        """, (course_id,), fetch=True)
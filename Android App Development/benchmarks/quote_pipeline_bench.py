@@ -0,0 +1,112 @@
+# Load benchmark for the online quote pipeline (QuoteFetcher -> QuoteCache ->
+# QuoteBook) against a local mock of the zenquotes API.
+#
+#   python benchmarks/quote_pipeline_bench.py                       # 20 ms API, no errors
+#   python benchmarks/quote_pipeline_bench.py --latency-ms 300 --jitter-ms 200
+#   python benchmarks/quote_pipeline_bench.py --error-rate 0.3 --clicks-per-sec 20
+#   python benchmarks/quote_pipeline_bench.py --dump stats.json
+#
+# A simulated user clicks "New Quote" at a fixed rate for the given duration;
+# the QuoteStats snapshot (fetch latency percentiles, error and fallback rates,
+# cache hit rate, time to first quote) is printed at the end.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from persistence import writer
+from quote_core import QuoteBook, QuoteCache, QuoteFetcher, QuoteStats
+
+
+def mock_api(latency, jitter, error_rate, batch):
+    # Serves zenquotes-style [{"q", "a"}] batches after a random delay; a
+    # share of the requests fail with a 503
+    counter = iter(range(10 ** 12))
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(max(0.0, random.uniform(latency - jitter, latency + jitter)))
+            if random.random() < error_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            with lock:
+                ids = [next(counter) for _ in range(batch)]
+            body = json.dumps([{"q": f"Mock quote {i}", "a": f"Author {i % 50}"} for i in ids]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(args):
+    server = mock_api(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.batch)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/api/random"
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        stats = QuoteStats()
+        fetcher = QuoteFetcher(api_url, buffer_size=args.buffer, timeout=(1, args.timeout),
+                               breaker_cooldown=args.breaker_cooldown, cache=QuoteCache(path=None), stats=stats)
+        book = QuoteBook(quotes_file=os.path.join(workdir, "quotes.json"),
+                         favorites_file=os.path.join(workdir, "favorites.jsonl"),
+                         last_quote_file=os.path.join(workdir, "last_quote.json"),
+                         corpus_file=None, fetcher=fetcher)
+
+        # Like QuoteApp on a fresh day: the first quote is picked right away
+        book.next_quote()
+        stats.record_first_quote(time.perf_counter() - started, "new")
+
+        interval = 1 / args.clicks_per_sec
+        deadline = time.monotonic() + args.duration
+        next_click = time.monotonic()
+        while next_click < deadline:
+            time.sleep(max(0.0, next_click - time.monotonic()))
+            book.next_quote()
+            next_click += interval
+
+        fetcher.stop()
+        book.close()
+        writer.flush()
+    server.shutdown()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the quote pipeline against a local mock API.")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--batch", type=int, default=1, help="quotes per API response")
+    parser.add_argument("--buffer", type=int, default=5, help="prefetch buffer size")
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument("--breaker-cooldown", type=float, default=2)
+    parser.add_argument("--clicks-per-sec", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--dump", help="also write the stats JSON to this file")
+    args = parser.parse_args()
+
+    stats = run(args)
+    print(json.dumps(stats.snapshot(), indent=2))
+    if args.dump:
+        stats.dump(args.dump)
+
+
+if __name__ == "__main__":
+    main()
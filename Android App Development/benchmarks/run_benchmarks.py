@@ -0,0 +1,398 @@
+# Headless benchmark suite for the core (UI-free) layer of all five apps.
+#
+#   python benchmarks/run_benchmarks.py                      # 1k / 100k / 1M records
+#   python benchmarks/run_benchmarks.py --sizes 1000 100000  # quicker run
+#   python benchmarks/run_benchmarks.py --only todo quiz
+#   python benchmarks/run_benchmarks.py --save-baseline      # record new baseline
+#
+# Every metric is a throughput (operations or records per second, higher is
+# better). Results go to benchmarks/results.json and are compared against
+# benchmarks/baseline.json; anything slower than the baseline by more than
+# REGRESSION_THRESHOLD is reported as a regression.
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from persistence import writer
+from todo_core import TodoList
+from quote_core import QuoteBook, QuoteCorpus
+from alarm_core import AlarmBook
+from quiz_core import QuizBank, convert_quizzes_to_shards
+from quiz_history import AttemptStore, attempt_analytics
+from attendance_core import AttendanceDB
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.json")
+SIZES = [1_000, 100_000, 1_000_000]
+REGRESSION_THRESHOLD = 1.25
+PRIORITIES = ["High", "Medium", "Low"]
+WORDS = ["buy", "milk", "write", "report", "call", "mom", "fix", "bug", "plan", "trip", "read", "book"]
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def rate(count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def random_title():
+    return " ".join(random.sample(WORDS, 3))
+
+
+def random_date():
+    return f"20{random.randint(20, 30)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+
+
+# ---------------- TO-DO ----------------
+@benchmark("todo")
+def bench_todo(n, workdir):
+    results = {}
+    files = {"snapshot_file": os.path.join(workdir, "tasks.json"),
+             "journal_file": os.path.join(workdir, "tasks.journal")}
+    write_json(files["snapshot_file"], {"next_id": n + 1, "tasks": [
+        {"id": i, "title": random_title(), "priority": random.choice(PRIORITIES), "due_date": random_date(),
+         "completed": False} for i in range(1, n + 1)]})
+
+    todo = TodoList(**files)
+    results["load records/s"] = rate(n, todo.load)
+    # The reminder heap is filled on first use, timed apart from the adds
+    results["reminders fill records/s"] = rate(n, lambda: len(todo.reminders))
+
+    ops = min(n, 10_000)
+    results["add ops/s"] = rate(ops, lambda: [
+        todo.add(random_title(), random.choice(PRIORITIES), random_date()) for _ in range(ops)])
+
+    ids = list(todo.tasks)
+    results["toggle ops/s"] = rate(ops, lambda: [todo.toggle(random.choice(ids)) for _ in range(ops)])
+    results["save (compact) records/s"] = rate(len(ids), todo.store.compact)
+
+    queries = [("Overdue", "Added", ""), ("High priority, active", "Due Date", ""),
+               ("All", "Added", "bu"), ("Active", "Priority", "report")]
+    rounds = 5
+    results["query views/s"] = rate(rounds * len(queries), lambda: [
+        todo.query(view, sort, text) for _ in range(rounds) for view, sort, text in queries])
+    todo.close()
+    return results
+
+
+@benchmark("todo_sqlite")
+def bench_todo_sqlite(n, workdir):
+    results = {}
+    todo = TodoList("sqlite", db_file=os.path.join(workdir, "tasks.db"))
+    todo.load()
+
+    rows = [(random_title(), random.choice(PRIORITIES), random_date()) for _ in range(n)]
+    with todo.store.conn:
+        todo.store.conn.executemany(
+            "INSERT INTO tasks (title, priority, priority_rank, due_date, completed) VALUES (?, ?, ?, ?, 0)",
+            [(title, priority, PRIORITIES.index(priority), due) for title, priority, due in rows])
+
+    results["reminders fill records/s"] = rate(n, lambda: len(todo.reminders))
+
+    # Each add is its own committed transaction
+    ops = min(n, 1_000)
+    results["add ops/s"] = rate(ops, lambda: [todo.add(*rows[i]) for i in range(ops)])
+
+    queries = [("Overdue", "Added", ""), ("High priority, active", "Added", ""), ("All", "Added", "bu")]
+    rounds = 5
+    results["query views/s"] = rate(rounds * len(queries), lambda: [
+        todo.query(view, sort, text, prefix=True) for _ in range(rounds) for view, sort, text in queries])
+    todo.close()
+    return results
+
+
+# ---------------- QUOTES ----------------
+@benchmark("quotes")
+def bench_quotes(n, workdir):
+    results = {}
+    files = {"quotes_file": os.path.join(workdir, "quotes.json"),
+             "favorites_file": os.path.join(workdir, "favorites.jsonl"),
+             "legacy_favorites_file": os.path.join(workdir, "favorites.json"),
+             "last_quote_file": os.path.join(workdir, "last_quote.json")}
+    write_json(files["quotes_file"], [f"Quote number {i} – Author {i % 100}" for i in range(n)])
+    write_json(files["legacy_favorites_file"], [f"Favorite number {i}" for i in range(n)])
+
+    book = None
+
+    def load():
+        nonlocal book
+        book = QuoteBook(**files)
+    # The first start migrates favorites.json to the journal; time it apart
+    # so "load" stays the steady-state startup it was measured as
+    results["migrate favorites records/s"] = rate(n, load)
+    results["load records/s"] = rate(n, load)
+
+    picks = 100_000
+    results["random pick ops/s"] = rate(picks, lambda: [book.random_quote() for _ in range(picks)])
+
+    ops = min(n, 1_000)
+    results["add favorite ops/s"] = rate(ops, lambda: [book.add_favorite(f"New favorite {i}") for i in range(ops)])
+    results["search favorites queries/s"] = rate(100, lambda: [book.favorites.search("favorite 12") for _ in range(100)])
+
+    corpus_file = os.path.join(workdir, "quotes.jsonl")
+    with open(corpus_file, "w") as f:
+        f.writelines(json.dumps(f"Quote number {i} – Author {i % 100}") + "\n" for i in range(n))
+    QuoteCorpus(corpus_file).close()  # Build the offset index once, untimed
+    corpus = None
+
+    def open_corpus():
+        nonlocal corpus
+        corpus = QuoteCorpus(corpus_file)
+    results["corpus open records/s"] = rate(n, open_corpus)
+    results["corpus random pick ops/s"] = rate(picks, lambda: [corpus[random.randrange(n)] for _ in range(picks)])
+    corpus.close()
+    return results
+
+
+# ---------------- ALARMS ----------------
+@benchmark("alarms")
+def bench_alarms(n, workdir):
+    results = {}
+    alarm_file = os.path.join(workdir, "alarms.json")
+    write_json(alarm_file, [{"time": f"{random.randint(1, 12):02d}:{random.randint(0, 59):02d} "
+                                     f"{random.choice(['AM', 'PM'])}", "tone": "tone1.mp3", "active": True}
+                            for _ in range(n)])
+
+    book = None
+
+    def load():
+        nonlocal book
+        book = AlarmBook(alarm_file)
+    results["load records/s"] = rate(n, load)
+
+    ops = min(n, 10_000)
+    results["toggle ops/s"] = rate(ops, lambda: [book.toggle(random.randrange(n)) for _ in range(ops)])
+    results["add ops/s"] = rate(ops, lambda: [book.add_alarm("7", str(i % 60), "AM") for i in range(ops)])
+
+    # One tick per minute over the next day; every active alarm fires once
+    ticks = 24 * 60
+    start = datetime.now()
+    results["due check ticks/s"] = rate(ticks, lambda: [
+        book.due_alarms(start + timedelta(minutes=i)) for i in range(1, ticks + 1)])
+    results["save records/s"] = rate(len(book.alarms), lambda: (book.save_alarms(), writer.flush()))
+
+    # Recurring rules keep re-arming, so every tick of the day has work
+    rules = ["daily", "weekdays", "mon,wed,fri", "every 90", "every 2h", "*/15 6-9 * * mon-fri", "0 7 1,15 * *"]
+    recurring_file = os.path.join(workdir, "recurring.json")
+    write_json(recurring_file, [{"time": f"{random.randint(1, 12):02d}:{random.randint(0, 59):02d} AM",
+                                 "tone": "tone1.mp3", "active": True, "repeat": random.choice(rules)}
+                                for _ in range(min(n, 10_000))])
+    recurring = AlarmBook(recurring_file)
+    results["recurring due check ticks/s"] = rate(ticks, lambda: [
+        recurring.due_alarms(start + timedelta(minutes=i)) for i in range(1, ticks + 1)])
+    return results
+
+
+# ---------------- QUIZ ----------------
+@benchmark("quiz")
+def bench_quiz(n, workdir):
+    results = {}
+    quiz_file = os.path.join(workdir, "quizzes.json")
+    per_quiz = 100
+    write_json(quiz_file, {
+        f"Quiz {q}": [{"question": f"Question {q}-{i}?",
+                       "options": ["Alpha", "Beta", "Gamma", "Delta"],
+                       "answer": "Gamma", "tags": [f"tag{(q + i) % 50}"],
+                       "difficulty": random.choice(["easy", "medium", "hard"])}
+                      for i in range(min(per_quiz, n - q * per_quiz))]
+        for q in range((n + per_quiz - 1) // per_quiz)})
+
+    bank = None
+
+    def load():
+        nonlocal bank
+        bank = QuizBank(quiz_file, cache_file="")
+    results["load questions/s"] = rate(n, load)
+
+    # Cold start to the menu (titles) from the compiled cache, built untimed
+    QuizBank(quiz_file)
+    results["compiled load questions/s"] = rate(n, lambda: QuizBank(quiz_file).titles())
+
+    compiled = QuizBank(quiz_file)
+    compiled.question_index()
+    rounds = 100
+    results["generate 20-question quizzes/s"] = rate(rounds, lambda: [
+        compiled.generate(20, "tag:tag7 difficulty:easy") for _ in range(rounds)])
+
+    titles = bank.titles()
+    played = random.sample(titles, min(len(titles), 1_000))
+
+    def play():
+        for title in played:
+            session = bank.start(title)
+            while not session.finished():
+                session.answer(random.choice(session.current()["options"]))
+    answered = sum(len(bank.questions(title)) for title in played)
+    results["answer ops/s"] = rate(answered, play)
+
+    shard_dir = os.path.join(workdir, "quizzes")
+    convert_quizzes_to_shards(quiz_file, shard_dir)
+    sharded = None
+
+    def open_sharded():
+        nonlocal sharded
+        sharded = QuizBank(quiz_file, shard_dir, cache_file="")
+    results["sharded open questions/s"] = rate(n, open_sharded)
+    results["sharded start quizzes/s"] = rate(len(played), lambda: [sharded.start(title) for title in played])
+
+    history = AttemptStore(os.path.join(workdir, "quiz_history"))
+    pool = bank.questions(played[0])
+    ops = min(n, 100_000)
+    results["record answer ops/s"] = rate(ops, lambda: (
+        [history.record(random.choice(pool), random.choice(["Alpha", "Gamma"]), 3.0, random.choice(["ann", "bob"]))
+         for _ in range(ops)], history.flush()))
+    results["analytics answers/s"] = rate(ops, lambda: attempt_analytics(history))
+    return results
+
+
+# ---------------- ATTENDANCE ----------------
+class ConnectPerCallDB(AttendanceDB):
+    # The original AttendanceApp.execute: a fresh connection and a commit for
+    # every statement, kept to measure the long-lived connection against.
+    # No persistent connection and no pragmas; the database must already exist.
+    def __init__(self, db_name):
+        self.db_name = db_name
+
+    def close(self):
+        pass
+
+    def execute(self, query, params=(), fetch=False):
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        conn.commit()
+        data = cursor.fetchall() if fetch else None
+        conn.close()
+        return data
+
+
+@benchmark("attendance")
+def bench_attendance(n, workdir):
+    results = {}
+    db_name = os.path.join(workdir, "university.db")
+    db = AttendanceDB(db_name)
+    students = max(1, n // 10)
+    # Bulk setup; only the app's own code paths are timed
+    with sqlite3.connect(db_name) as conn:
+        conn.executemany("INSERT INTO courses (name, instructor_id) VALUES (?, 1)",
+                         [(f"Course {i}",) for i in range(10)])
+        conn.executemany("INSERT INTO users (username, password, role) VALUES (?, 'pw', 'student')",
+                         [(f"student{i}",) for i in range(students)])
+        conn.executemany("INSERT INTO attendance (student_id, course_id, date) VALUES (?, ?, ?)",
+                         [(random.randint(2, students + 1), random.randint(1, 10), f"past-{i % 365}")
+                          for i in range(n)])
+
+    ops = min(n, 2_000)
+    results["mark attendance ops/s"] = rate(ops, lambda: [
+        db.mark_attendance(random.randint(2, students + 1), random.randint(1, 10), f"day-{i}") for i in range(ops)])
+    results["report queries/s"] = rate(20, lambda: [db.attendance_report(random.randint(1, 10)) for _ in range(20)])
+
+    # Small statements, where connection setup and commits dominate
+    ops = 2_000
+    results["login ops/s"] = rate(ops, lambda: [
+        db.login(f"student{random.randrange(students)}", "pw", "student") for _ in range(ops)])
+    results["add course ops/s"] = rate(ops, lambda: [db.add_course(f"Extra {i}", 1) for i in range(ops)])
+
+    # Same data in a database of its own in the default rollback journal
+    # mode, as the original app created it
+    legacy_name = os.path.join(workdir, "university-legacy.db")
+    with sqlite3.connect(legacy_name) as legacy_conn:
+        db.conn.backup(legacy_conn)
+        legacy_conn.execute("PRAGMA journal_mode=DELETE")
+    legacy_conn.close()
+    db.close()
+
+    legacy = ConnectPerCallDB(legacy_name)
+    results["login ops/s (connect per call)"] = rate(ops, lambda: [
+        legacy.login(f"student{random.randrange(students)}", "pw", "student") for _ in range(ops)])
+    results["add course ops/s (connect per call)"] = rate(ops, lambda: [
+        legacy.add_course(f"Extra {i}", 1) for i in range(ops)])
+    legacy.close()
+    return results
+
+
+# ---------------- RUNNER ----------------
+def run(sizes, only):
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        for n in sizes:
+            random.seed(n)
+            with tempfile.TemporaryDirectory() as workdir:
+                start = time.perf_counter()
+                metrics = fn(n, workdir)
+                elapsed = time.perf_counter() - start
+            for metric, value in metrics.items():
+                results[f"{name}/{n}/{metric}"] = value
+            print(f"{name:<12} n={n:<9,} done in {elapsed:6.1f}s")
+    return results
+
+
+def compare(results, baseline):
+    regressions = []
+    print(f"\n{'benchmark':<58} {'result':>14} {'baseline':>14}")
+    for key, value in results.items():
+        base = baseline.get(key)
+        flag = ""
+        if base and value * REGRESSION_THRESHOLD < base:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        base_text = f"{base:14,.0f}" if base else f"{'-':>14}"
+        print(f"{key:<58} {value:14,.0f} {base_text}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the headless app cores.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.only)
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
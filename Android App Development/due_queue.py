@@ -0,0 +1,54 @@
+import heapq
+import itertools
+from datetime import datetime
+
+
+class DueQueue:
+    # Min-heap of [due, seq, key], shared by the To-Do reminders and the alarm
+    # scheduler. Rescheduling or cancelling only marks the old entry stale
+    # (O(log n) push, O(1) cancel); stale entries are dropped when they reach
+    # the top, and the heap is rebuilt if they ever outnumber the live ones.
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+
+    def reset(self, items, ordered=False):
+        # Replaces the whole queue with (due, key) pairs; `ordered` when they
+        # already come sorted by due, which makes the list a valid heap as is
+        self.heap = [[due, seq, key] for (due, key), seq in zip(items, self.counter)]
+        if not ordered:
+            heapq.heapify(self.heap)
+        self.entries = {entry[2]: entry for entry in self.heap}
+
+    def push(self, key, due):
+        self.cancel(key)
+        entry = [due, next(self.counter), key]
+        self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+        return entry
+
+    def cancel(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[2] = None
+            if len(self.heap) > 2 * len(self.entries) + 64:
+                self.heap = [e for e in self.heap if e[2] is not None]
+                heapq.heapify(self.heap)
+
+    def next_time(self):
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now=None):
+        now = now or datetime.now()
+        due = []
+        while self.next_time() is not None and self.heap[0][0] <= now:
+            key = heapq.heappop(self.heap)[2]
+            del self.entries[key]
+            due.append(key)
+        return due
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,101 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+SAVE_DELAY = 0.25  # Seconds of quiet before a burst of saves is written out
+
+log = logging.getLogger(__name__)
+
+
+def write_atomic(path, data, binary=False):
+    # Write to a temp file next to the target and swap it in, so a crash leaves
+    # either the old file or the new one, never a half-written one. `data` is
+    # a str (bytes with binary=True) or an iterable of them, written as it
+    # is produced.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb" if binary else "w") as f:
+        if isinstance(data, (str, bytes)):
+            f.write(data)
+        else:
+            f.writelines(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, data, indent=None):
+    separators = None if indent else (",", ":")
+    write_atomic(path, json.dumps(data, indent=indent, separators=separators))
+
+
+class BackgroundJsonWriter:
+    # Shared by every app: save() only records the latest data for a path and
+    # returns, a single daemon thread writes each dirty path once per burst.
+    # The data is serialized on that thread, so callers pass either a copy
+    # they won't mutate afterwards or a function returning one, called on the
+    # writer thread (once per burst, however many saves came in).
+    def __init__(self, delay=SAVE_DELAY):
+        self.delay = delay
+        self.pending = {}
+        self.last_save = 0.0
+        self.writing = False
+        self.flushing = False
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def save(self, path, data):
+        with self.cond:
+            self.pending[path] = data
+            self.last_save = time.monotonic()
+            self.cond.notify_all()
+
+    def flush(self):
+        with self.cond:
+            self.flushing = True
+            self.cond.notify_all()
+            while self.pending or self.writing:
+                self.cond.wait()
+            self.flushing = False
+
+    def close(self):
+        self.flush()
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed and not self.pending:
+                    return
+                # Debounce: keep waiting while saves are still arriving
+                while not self.flushing:
+                    remaining = self.last_save + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = self.pending
+                self.pending = {}
+                self.writing = True
+
+            for path, data in batch.items():
+                try:
+                    write_json_atomic(path, data() if callable(data) else data)
+                except (OSError, TypeError, ValueError):
+                    log.exception("Failed to save %s", path)
+
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
+
+
+writer = BackgroundJsonWriter()
+atexit.register(writer.flush)
@@ -0,0 +1,432 @@
+import bisect
+import itertools
+import json
+import marshal
+import os
+import random
+from array import array
+from collections import OrderedDict
+from persistence import write_atomic, write_json_atomic
+
+QUIZ_FILE = "quizzes.json"  # You can define multiple quizzes here
+QUIZ_SHARDS = "quizzes"  # Optional sharded bank: manifest.json plus one JSONL file per quiz
+MANIFEST_FILE = "manifest.json"
+SHARD_INDEX_FILE = "index.bin"  # Tag index of a sharded bank, next to the manifest
+MAX_CACHED_QUESTIONS = 50_000  # Questions of lazily loaded quizzes kept in memory
+COMPILED_VERSION = 3  # Bump when the compiled cache layout changes
+MAX_STRING_TABLES = 64  # Decoded option tables of compiled quizzes kept for generate()
+GENERATED_TITLE = "✨ Generated Quiz"
+FILTER_FIELDS = ["category", "tag", "difficulty"]
+
+DEFAULT_QUIZZES = {
+    "General Knowledge": [
+        {
+            "question": "What is the capital of France?",
+            "options": ["Berlin", "Madrid", "Paris", "Lisbon"],
+            "answer": "Paris"
+        },
+        {
+            "question": "Who wrote 'Romeo and Juliet'?",
+            "options": ["Charles Dickens", "William Shakespeare", "Jane Austen", "Leo Tolstoy"],
+            "answer": "William Shakespeare"
+        }
+    ],
+    "Science": [
+        {
+            "question": "What is the chemical symbol for water?",
+            "options": ["H2O", "O2", "CO2", "NaCl"],
+            "answer": "H2O"
+        },
+        {
+            "question": "Which planet is known as the Red Planet?",
+            "options": ["Venus", "Earth", "Mars", "Saturn"],
+            "answer": "Mars"
+        }
+    ]
+}
+
+
+def index_keys(title, question):
+    # Questions may carry "category" (defaults to the quiz title), "tags"
+    # and "difficulty"; each becomes a "field:value" key of the tag index
+    yield f"category:{question.get('category', title)}".lower()
+    for tag in question.get("tags", ()):
+        yield f"tag:{tag}".lower()
+    if question.get("difficulty"):
+        yield f"difficulty:{question['difficulty']}".lower()
+
+
+def build_question_index(quizzes):
+    # key -> packed uint32 array of global question ids (quizzes in order,
+    # then question position), ascending
+    keys = {}
+    ids = itertools.count()
+    for title, questions in quizzes.items():
+        for question in questions:
+            question_id = next(ids)
+            for key in index_keys(title, question):
+                keys.setdefault(key, array("I")).append(question_id)
+    return {key: ids.tobytes() for key, ids in keys.items()}
+
+
+def parse_filters(text):
+    # "tag:history difficulty:easy" -> index keys. Category and difficulty
+    # values with spaces use underscores, e.g. category:general_knowledge;
+    # tags are matched as typed, so tag:world_war_2 finds that exact tag.
+    keys = []
+    for token in text.lower().split():
+        field, sep, value = token.partition(":")
+        if not sep or field not in FILTER_FIELDS or not value:
+            raise ValueError(f"Unknown filter '{token}'. Use category:, tag: or difficulty:.")
+        if field != "tag":
+            value = value.replace("_", " ")
+        keys.append(f"{field}:{value}")
+    return keys
+
+
+class QuestionIndex:
+    # Samples questions across the whole bank without touching it: per-key
+    # sorted id arrays pick the ids, and only the chosen questions are looked
+    # up (id -> quiz via bisect over the running question counts).
+    REJECTION_TRIES = 20  # Random probes per wanted question before a full scan
+
+    def __init__(self, counts, packed):
+        self.titles = list(counts)
+        self.offsets = list(itertools.accumulate(counts.values(), initial=0))
+        self.packed = packed
+        self.arrays = {}
+
+    def total(self):
+        return self.offsets[-1]
+
+    def ids(self, key):
+        if key not in self.arrays:
+            ids = array("I")
+            ids.frombytes(self.packed.get(key, b""))
+            self.arrays[key] = ids
+        return self.arrays[key]
+
+    def locate(self, question_id):
+        quiz = bisect.bisect_right(self.offsets, question_id) - 1
+        return self.titles[quiz], question_id - self.offsets[quiz]
+
+    def sample(self, n, keys=(), rng=random):
+        # Ids matching every key: index sampling from the smallest array,
+        # probing the others by bisect; a reservoir pass over the smallest
+        # array if the matches are too sparse for random probes
+        if not keys:
+            return rng.sample(range(self.total()), min(n, self.total()))
+        arrays = sorted((self.ids(key) for key in keys), key=len)
+        smallest, others = arrays[0], arrays[1:]
+        if not others:
+            return [smallest[i] for i in rng.sample(range(len(smallest)), min(n, len(smallest)))]
+
+        def matches(question_id):
+            for ids in others:
+                i = bisect.bisect_left(ids, question_id)
+                if i == len(ids) or ids[i] != question_id:
+                    return False
+            return True
+
+        picked = set()
+        for _ in range(self.REJECTION_TRIES * n):
+            if len(picked) == n or not smallest:
+                return list(picked)
+            question_id = smallest[rng.randrange(len(smallest))]
+            if question_id not in picked and matches(question_id):
+                picked.add(question_id)
+
+        reservoir = []
+        seen = 0
+        for question_id in smallest:
+            if matches(question_id):
+                seen += 1
+                if len(reservoir) < n:
+                    reservoir.append(question_id)
+                else:
+                    j = rng.randrange(seen)
+                    if j < n:
+                        reservoir[j] = question_id
+        return reservoir
+
+
+def convert_quizzes_to_shards(quiz_file=QUIZ_FILE, shard_dir=QUIZ_SHARDS):
+    # Conversion of a single quizzes.json into a sharded bank. The manifest
+    # records the source's stamp and is written last, so a half-done
+    # conversion is never picked up and QuizBank can tell when it is stale.
+    stamp = source_stamp(quiz_file)
+    with open(quiz_file, "r") as f:
+        quizzes = json.load(f)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = []
+    for number, (title, questions) in enumerate(quizzes.items()):
+        shard = f"quiz-{number:05d}.jsonl"
+        offsets = f"quiz-{number:05d}.idx"
+        write_quiz_shard(os.path.join(shard_dir, shard), os.path.join(shard_dir, offsets), questions)
+        manifest.append({"title": title, "count": len(questions), "shard": shard, "offsets": offsets})
+    write_atomic(os.path.join(shard_dir, SHARD_INDEX_FILE), marshal.dumps(build_question_index(quizzes)), binary=True)
+    write_json_atomic(os.path.join(shard_dir, MANIFEST_FILE), {"stamp": stamp, "quizzes": manifest})
+
+
+def write_quiz_shard(shard_file, offsets_file, questions):
+    # One question per line, plus the byte offset of every line (array "Q",
+    # count + 1 entries) so a single question can be read with one seek
+    lines = [(json.dumps(question) + "\n").encode() for question in questions]
+    offsets = array("Q", itertools.accumulate(map(len, lines), initial=0))
+    write_atomic(shard_file, lines, binary=True)
+    write_atomic(offsets_file, offsets.tobytes(), binary=True)
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def compile_quiz(questions):
+    # One quiz as (count, strings, offsets, rows): options and answers are
+    # stored once in a marshalled string table, and each question is its own
+    # marshal blob of (text, option ids, answer) in `rows`, delimited by
+    # `offsets` (array "Q"), so any question decodes without the others. The
+    # answer is an option index, or -1 - string id when it isn't an option.
+    strings, ids = [], {}
+
+    def intern(text):
+        if text not in ids:
+            ids[text] = len(strings)
+            strings.append(text)
+        return ids[text]
+
+    rows = bytearray()
+    offsets = array("Q", [0])
+    for question in questions:
+        options = question["options"]
+        answer = options.index(question["answer"]) if question["answer"] in options else -1 - intern(question["answer"])
+        rows += marshal.dumps((question["question"], tuple(intern(o) for o in options), answer))
+        offsets.append(len(rows))
+    return len(questions), marshal.dumps(strings), offsets.tobytes(), bytes(rows)
+
+
+def compile_quizzes(quiz_file, cache_file):
+    # Binary form of quizzes.json: title -> compiled quiz (see compile_quiz).
+    # Loading it only unpacks the titles; questions are decoded when a quiz
+    # is started, or one by one when generate() picks them.
+    stamp = source_stamp(quiz_file)
+    with open(quiz_file, "r") as f:
+        quizzes = json.load(f)
+    compiled = {title: compile_quiz(questions) for title, questions in quizzes.items()}
+    payload = {"version": COMPILED_VERSION, "stamp": stamp, "quizzes": compiled,
+               "index": build_question_index(quizzes)}
+
+    try:
+        write_atomic(cache_file, marshal.dumps(payload), binary=True)
+    except OSError:
+        pass  # Read-only or full disk: use it uncached, rebuilt next start
+    return payload
+
+
+def load_compiled_quizzes(quiz_file, cache_file):
+    # The compiled cache if it was built from the current quizzes.json
+    # (same size and mtime), otherwise it is rebuilt first
+    try:
+        with open(cache_file, "rb") as f:
+            payload = marshal.loads(f.read())
+        if payload["version"] == COMPILED_VERSION and tuple(payload["stamp"]) == source_stamp(quiz_file):
+            return payload
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        pass  # Missing, torn or from another Python version
+    return compile_quizzes(quiz_file, cache_file)
+
+
+class QuizBank:
+    # UI-free quiz model behind QuizApp: quiz titles and their questions.
+    # With a sharded bank only the manifest (titles and question counts) is
+    # read at startup; with a single quizzes.json its compiled cache is loaded
+    # (`cache_file`, "" to always parse the JSON). Either way a quiz's
+    # questions are only turned into dicts when it is started, and kept in an
+    # LRU capped at `max_cached` questions in total. generate() reads just the
+    # questions it picks (one seek per question in a shard, one small blob in
+    # the compiled cache) and leaves the LRU alone.
+    def __init__(self, quiz_file=QUIZ_FILE, shard_dir=QUIZ_SHARDS, max_cached=MAX_CACHED_QUESTIONS, cache_file=None):
+        self.quiz_file = quiz_file
+        self.shard_dir = shard_dir
+        self.cache_file = f"{quiz_file}.cache" if cache_file is None else cache_file
+        self.max_cached = max_cached
+        self.cached = OrderedDict()
+        self.cached_count = 0
+        self.string_tables = OrderedDict()
+        self.shards = None
+        self.compiled = None
+        self.packed_index = None  # Tag index as stored, unpacked on first generate()
+        self.index = None
+        self.load_questions = None  # title -> questions, None when quiz_data holds them all
+        self.load_rows = None  # (title, positions) -> those questions only
+        self.quiz_data = self.load_quizzes()
+
+    def load_quizzes(self):
+        manifest_file = os.path.join(self.shard_dir, MANIFEST_FILE) if self.shard_dir else None
+        if manifest_file and os.path.exists(manifest_file):
+            manifest = self.load_manifest(manifest_file)
+            self.shards = {quiz["title"]: quiz for quiz in manifest}
+            self.load_questions = self.load_shard
+            self.load_rows = self.read_shard_rows
+            with open(os.path.join(self.shard_dir, SHARD_INDEX_FILE), "rb") as f:
+                self.packed_index = marshal.loads(f.read())
+            return {quiz["title"]: quiz["count"] for quiz in manifest}
+        if os.path.exists(self.quiz_file):
+            if self.cache_file:
+                self.compiled = load_compiled_quizzes(self.quiz_file, self.cache_file)
+                self.load_questions = self.decode_quiz
+                self.load_rows = self.decode_rows
+                self.packed_index = self.compiled["index"]
+                return {title: quiz[0] for title, quiz in self.compiled["quizzes"].items()}
+            with open(self.quiz_file, "r") as f:
+                return json.load(f)
+        return DEFAULT_QUIZZES
+
+    def load_manifest(self, manifest_file):
+        # Re-shards first when quizzes.json changed since the conversion
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+        if os.path.exists(self.quiz_file) and tuple(manifest["stamp"]) != source_stamp(self.quiz_file):
+            convert_quizzes_to_shards(self.quiz_file, self.shard_dir)
+            with open(manifest_file, "r") as f:
+                manifest = json.load(f)
+        return manifest["quizzes"]
+
+    def load_shard(self, title):
+        with open(os.path.join(self.shard_dir, self.shards[title]["shard"]), "r") as f:
+            return json.loads("[" + ",".join(f.read().splitlines()) + "]")
+
+    def read_shard_rows(self, title, positions):
+        shard = self.shards[title]
+        questions = []
+        with open(os.path.join(self.shard_dir, shard["offsets"]), "rb") as offsets_file, \
+                open(os.path.join(self.shard_dir, shard["shard"]), "rb") as f:
+            for position in positions:
+                offsets_file.seek(position * 8)
+                start, end = array("Q", offsets_file.read(16))
+                f.seek(start)
+                questions.append(json.loads(f.read(end - start)))
+        return questions
+
+    def string_table(self, title):
+        if title in self.string_tables:
+            self.string_tables.move_to_end(title)
+        else:
+            self.string_tables[title] = marshal.loads(self.compiled["quizzes"][title][1])
+            if len(self.string_tables) > MAX_STRING_TABLES:
+                self.string_tables.popitem(last=False)
+        return self.string_tables[title]
+
+    def decode_rows(self, title, positions):
+        _, _, packed_offsets, rows = self.compiled["quizzes"][title]
+        strings = self.string_table(title)
+        offsets = memoryview(packed_offsets).cast("Q")
+        rows = memoryview(rows)
+        questions = []
+        for position in positions:
+            text, option_ids, answer = marshal.loads(rows[offsets[position]:offsets[position + 1]])
+            options = [strings[o] for o in option_ids]
+            questions.append({"question": text, "options": options,
+                              "answer": options[answer] if answer >= 0 else strings[-1 - answer]})
+        return questions
+
+    def decode_quiz(self, title):
+        return self.decode_rows(title, range(self.quiz_data[title]))
+
+    def titles(self):
+        return list(self.quiz_data)
+
+    def count(self, title):
+        return self.quiz_data[title] if self.load_questions else len(self.quiz_data[title])
+
+    def questions(self, title):
+        if self.load_questions is None:
+            return self.quiz_data[title]
+        if title in self.cached:
+            self.cached.move_to_end(title)
+            return self.cached[title]
+
+        questions = self.load_questions(title)
+        self.cached[title] = questions
+        self.cached_count += len(questions)
+        # Always keep the quiz just loaded, even if it alone is over the cap
+        while self.cached_count > self.max_cached and len(self.cached) > 1:
+            _, evicted = self.cached.popitem(last=False)
+            self.cached_count -= len(evicted)
+        return questions
+
+    def questions_at(self, title, positions):
+        # Just the questions at `positions`, from the LRU when the quiz is
+        # already there, otherwise read without loading (or caching) the quiz
+        if self.load_questions is None:
+            questions = self.quiz_data[title]
+        elif title in self.cached:
+            questions = self.cached[title]
+        else:
+            return self.load_rows(title, positions)
+        return [questions[position] for position in positions]
+
+    def random_title(self):
+        return random.choice(self.titles())
+
+    def start(self, title):
+        return QuizSession(title, self.questions(title))
+
+    def question_index(self):
+        if self.index is None:
+            if self.packed_index is None:
+                # Plain JSON, all in memory: index what is loaded
+                self.packed_index = build_question_index(self.quiz_data)
+            counts = {title: self.count(title) for title in self.quiz_data}
+            self.index = QuestionIndex(counts, self.packed_index)
+        return self.index
+
+    def generate(self, n, filters=""):
+        # A quiz of up to n random questions from all quizzes, matching every
+        # filter (see parse_filters)
+        keys = parse_filters(filters)
+        index = self.question_index()
+        picked = [index.locate(question_id) for question_id in index.sample(n, keys)]
+        by_quiz = {}
+        for title, position in picked:
+            by_quiz.setdefault(title, []).append(position)
+        found = {}
+        for title, positions in by_quiz.items():
+            for position, question in zip(positions, self.questions_at(title, positions)):
+                found[title, position] = question
+        questions = [found[key] for key in picked]
+        if not questions:
+            raise ValueError("No questions match those filters.")
+        return QuizSession(GENERATED_TITLE, questions)
+
+
+class QuizSession:
+    # One run through a quiz: current position, score and the answers given.
+    def __init__(self, title, questions):
+        self.title = title
+        self.questions = questions
+        self.question_index = 0
+        self.score = 0
+        self.user_answers = []
+
+    def total(self):
+        return len(self.questions)
+
+    def finished(self):
+        return self.question_index >= len(self.questions)
+
+    def current(self):
+        return self.questions[self.question_index]
+
+    def answer(self, selected):
+        question = self.current()
+        correct = question["answer"]
+        is_correct = selected == correct
+        if is_correct:
+            self.score += 1
+
+        self.user_answers.append({"question": question["question"],
+                                  "your_answer": selected, "correct_answer": correct})
+        self.question_index += 1
+        return is_correct, correct
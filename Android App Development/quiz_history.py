@@ -0,0 +1,194 @@
+import getpass
+import hashlib
+import itertools
+import json
+import os
+from array import array
+from collections import Counter
+from persistence import write_json_atomic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HISTORY_DIR = "quiz_history"
+QUESTIONS_FILE = "questions.jsonl"  # Text and options of every question ever answered
+USERS_FILE = "users.json"
+# Column name -> array typecode; one append-only binary file per column
+COLUMNS = {"question": "Q", "option": "b", "correct": "B", "millis": "I", "user": "H"}
+MIN_ATTEMPTS = 5  # Answers a question needs before it is ranked by difficulty
+HARDEST_SHOWN = 10
+
+
+def question_id(question):
+    # Stable 64-bit id from the question text, so ids survive bank edits
+    digest = hashlib.blake2b(question["question"].encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class AttemptStore:
+    # Every answer ever given, stored column-wise: question id, chosen option
+    # index (-1 if not among the options), correctness, time to answer (ms)
+    # and user. record() buffers in typed arrays and flush() appends each
+    # column to its own file, so millions of answers stay a few bytes each
+    # and analytics read whole columns at once.
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.pending = {name: array(code) for name, code in COLUMNS.items()}
+        self.known = None  # Question ids already in questions.jsonl, loaded on first record
+        self.new_questions = []
+        try:
+            self.default_user = getpass.getuser()
+        except Exception:
+            self.default_user = "local"
+        self.users = []
+        users_file = self.path(USERS_FILE)
+        if os.path.exists(users_file):
+            try:
+                with open(users_file, "r") as f:
+                    self.users = json.load(f)
+            except ValueError:
+                pass  # Unreadable (torn or hand-edited): answers keep their user ids, shown as "user N"
+        self.repair()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def column_file(self, name):
+        return self.path(f"{name}.bin")
+
+    def repair(self):
+        # A crash mid-flush can leave some columns one row longer than the
+        # others; cut them all back to the last complete row
+        sizes = {name: os.path.getsize(self.column_file(name)) if os.path.exists(self.column_file(name)) else 0
+                 for name in COLUMNS}
+        rows = min(sizes[name] // array(code).itemsize for name, code in COLUMNS.items())
+        for name, code in COLUMNS.items():
+            if sizes[name] != rows * array(code).itemsize:
+                os.truncate(self.column_file(name), rows * array(code).itemsize)
+
+    def user_id(self, user):
+        if user not in self.users:
+            self.users.append(user)
+            write_json_atomic(self.path(USERS_FILE), self.users)
+        return self.users.index(user)
+
+    def record(self, question, selected, seconds, user=None):
+        options = question["options"]
+        qid = question_id(question)
+        if self.known is None:
+            self.known = self.known_ids()
+        if qid not in self.known:
+            self.known.add(qid)
+            self.new_questions.append({"id": qid, "question": question["question"], "options": options,
+                                       "answer": question["answer"]})
+        self.pending["question"].append(qid)
+        self.pending["option"].append(options.index(selected) if selected in options else -1)
+        self.pending["correct"].append(selected == question["answer"])
+        self.pending["millis"].append(min(int(seconds * 1000), 2 ** 32 - 1))
+        self.pending["user"].append(self.user_id(user or self.default_user))
+
+    def flush(self):
+        if self.new_questions:
+            with open(self.path(QUESTIONS_FILE), "a") as f:
+                f.writelines(json.dumps(question) + "\n" for question in self.new_questions)
+            self.new_questions = []
+        if not self.pending["question"]:
+            return
+        for name, code in COLUMNS.items():
+            with open(self.column_file(name), "ab") as f:
+                self.pending[name].tofile(f)
+            self.pending[name] = array(code)
+
+    def known_ids(self):
+        # Ids in questions.jsonl: one line per distinct question, not per
+        # answer. Lines are written as {"id": <id>, ..., so only that prefix
+        # is parsed.
+        ids = set()
+        if os.path.exists(self.path(QUESTIONS_FILE)):
+            with open(self.path(QUESTIONS_FILE), "r") as f:
+                for line in f:
+                    head, sep, _ = line.partition(",")
+                    if sep and head.startswith('{"id": '):
+                        ids.add(int(head[len('{"id": '):]))
+        return ids
+
+    def read_column(self, name):
+        # Whole column in one read: a numpy array when numpy is installed,
+        # otherwise a typed array
+        path = self.column_file(name)
+        if np is not None:
+            return np.fromfile(path, dtype=np.dtype(COLUMNS[name])) if os.path.exists(path) else np.array([])
+        column = array(COLUMNS[name])
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                column.frombytes(f.read())
+        return column
+
+    def questions(self, ids):
+        # Stored text/options of the given question ids, one pass over the file
+        found = {}
+        if os.path.exists(self.path(QUESTIONS_FILE)):
+            with open(self.path(QUESTIONS_FILE), "r") as f:
+                for line in f:
+                    try:
+                        question = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line
+                    if question["id"] in ids:
+                        found[question["id"]] = question
+        return found
+
+
+def count_by(keys, mask=None):
+    # {key: count} of `keys`, only where mask is true; counted in C by
+    # numpy when available, else by Counter over C-level iterators
+    if np is not None:
+        keys = np.asarray(keys) if mask is None else np.asarray(keys)[np.asarray(mask, dtype=bool)]
+        values, counts = np.unique(keys, return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+    return Counter(keys if mask is None else itertools.compress(keys, mask))
+
+
+def attempt_analytics(store, min_attempts=MIN_ATTEMPTS, shown=HARDEST_SHOWN):
+    # Per-question difficulty (share answered wrong), how often each option
+    # of the hardest questions was picked, and accuracy per user
+    store.flush()
+    questions = store.read_column("question")
+    options = store.read_column("option")
+    correct = store.read_column("correct")
+    users = store.read_column("user")
+    if not len(questions):
+        return {"answers": 0, "hardest": [], "users": {}}
+
+    attempts = count_by(questions)
+    right = count_by(questions, correct)
+    ranked = sorted((qid for qid, count in attempts.items() if count >= min_attempts),
+                    key=lambda qid: right.get(qid, 0) / attempts[qid])[:shown]
+
+    # Option picks only need counting for the few questions shown
+    if np is not None:
+        mask = np.isin(questions, np.array(ranked, dtype=questions.dtype))
+        picks = Counter(zip(questions[mask].tolist(), options[mask].tolist()))
+    else:
+        mask = list(map(set(ranked).__contains__, questions))
+        picks = Counter(zip(itertools.compress(questions, mask), itertools.compress(options, mask)))
+
+    stored = store.questions(set(ranked))
+    hardest = []
+    for qid in ranked:
+        question = stored.get(qid, {"question": "?", "options": [], "answer": ""})
+        rates = {option: picks.get((qid, i), 0) / attempts[qid]
+                 for i, option in enumerate(question["options"])}
+        hardest.append({"question": question["question"], "answer": question["answer"],
+                        "attempts": attempts[qid], "accuracy": right.get(qid, 0) / attempts[qid],
+                        "option_rates": rates})
+
+    user_attempts = count_by(users)
+    user_right = count_by(users, correct)
+    names = store.users
+    accuracy = {names[user] if user < len(names) else f"user {user}": user_right.get(user, 0) / count
+                for user, count in user_attempts.items()}
+    return {"answers": len(questions), "hardest": hardest, "users": accuracy}
@@ -0,0 +1,582 @@
+import bisect
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from persistence import writer, write_atomic, write_json_atomic
+
+try:
+    import requests
+except ImportError:  # Headless tools and benchmarks run without it, offline only
+    requests = None
+
+QUOTES_FILE = "quotes.json"
+QUOTES_CORPUS = "quotes.jsonl"  # Optional large corpus, one JSON-encoded quote per line
+FAVORITES_FILE = "favorites.json"  # Pre-journal format, migrated on first load
+FAVORITES_JOURNAL = "favorites.jsonl"
+LAST_QUOTE_FILE = "last_quote.json"
+QUOTE_CACHE_FILE = "quote_cache.json"
+ROTATION_FILE = "quote_rotation.json"
+STATS_FILE = "quote_stats.json"
+LATENCY_SAMPLES = 1000  # Fetch latencies kept for the percentiles
+CACHE_SIZE = 500
+CACHE_TTL = 7 * 24 * 60 * 60  # Seconds a fetched quote stays servable
+API_URL = "https://zenquotes.io/api/random"
+API_TIMEOUT = (3.05, 5)  # Seconds to connect, seconds to read
+PREFETCH_SIZE = 5
+BREAKER_FAILURES = 3  # Consecutive failures before the API is skipped...
+BREAKER_COOLDOWN = 60  # ...for this many seconds
+
+
+def quote_hash(quote):
+    return hashlib.sha1(quote.encode("utf-8")).hexdigest()[:16]
+
+
+class QuoteCache:
+    # Bounded cache of fetched quotes, deduplicated by content hash. Only quotes
+    # not shown yet ("fresh") are served, in arrival order; shown ones move to
+    # "seen", kept just to drop repeats from the API, and are evicted first
+    # past `size`. Expired entries are dropped when met.
+    def __init__(self, path=QUOTE_CACHE_FILE, size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.path = path
+        self.size = size
+        self.ttl = ttl
+        self.fresh = OrderedDict()
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        now = time.time()
+        for name in ("fresh", "seen"):
+            entries = getattr(self, name)
+            for key, entry in data.get(name, []):
+                if now - entry["fetched"] < self.ttl:
+                    entries[key] = entry
+
+    def save(self):
+        if self.path:
+            writer.save(self.path, {"fresh": list(self.fresh.items()), "seen": list(self.seen.items())})
+
+    def fresh_count(self):
+        return len(self.fresh)
+
+    def __len__(self):
+        return len(self.fresh) + len(self.seen)
+
+    def add(self, quotes):
+        added = 0
+        with self.lock:
+            for quote in quotes:
+                key = quote_hash(quote)
+                if key in self.fresh or key in self.seen:
+                    continue
+                self.fresh[key] = {"quote": quote, "fetched": time.time()}
+                added += 1
+            while len(self) > self.size:
+                (self.seen or self.fresh).popitem(last=False)
+            if added:
+                self.save()
+        return added
+
+    def take(self):
+        # O(1) amortised; None once every fresh quote was shown, so the
+        # caller falls back to the local quotes
+        now = time.time()
+        with self.lock:
+            while self.fresh:
+                key, entry = self.fresh.popitem(last=False)
+                if now - entry["fetched"] < self.ttl:
+                    self.seen[key] = entry
+                    self.save()
+                    return entry["quote"]
+            return None
+
+
+class QuoteStats:
+    # Counters for the quote pipeline: API latency percentiles over the last
+    # LATENCY_SAMPLES fetches, API error rate, where served quotes came from
+    # (cache hit vs local fallback) and time to the first quote on startup.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.fetch_ok = 0
+        self.fetch_errors = 0
+        self.breaker_opens = 0
+        self.served = {"cache": 0, "local": 0, "daily": 0}
+        self.first_quote = None
+
+    def record_fetch(self, seconds, ok):
+        with self.lock:
+            self.latencies.append(seconds)
+            if ok:
+                self.fetch_ok += 1
+            else:
+                self.fetch_errors += 1
+
+    def record_breaker_open(self):
+        with self.lock:
+            self.breaker_opens += 1
+
+    def record_serve(self, source):
+        with self.lock:
+            self.served[source] += 1
+
+    def record_first_quote(self, seconds, source):
+        with self.lock:
+            if self.first_quote is None:
+                self.first_quote = {"seconds": seconds, "source": source}
+
+    def percentile(self, ordered, p):
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def snapshot(self):
+        with self.lock:
+            ordered = sorted(self.latencies)
+            fetches = self.fetch_ok + self.fetch_errors
+            picked = self.served["cache"] + self.served["local"]
+            return {
+                "fetches": fetches,
+                "fetch_error_rate": self.fetch_errors / fetches if fetches else 0.0,
+                "breaker_opens": self.breaker_opens,
+                "fetch_latency_ms": {f"p{p}": None if v is None else round(v * 1000, 1)
+                                     for p in (50, 95, 99) for v in [self.percentile(ordered, p)]},
+                "served": dict(self.served),
+                "cache_hit_rate": self.served["cache"] / picked if picked else 0.0,
+                "fallback_rate": self.served["local"] / picked if picked else 0.0,
+                "first_quote": self.first_quote,
+            }
+
+    def dump(self, path=STATS_FILE):
+        write_json_atomic(path, self.snapshot(), indent=2)
+
+
+class QuoteFetcher:
+    # Keeps at least `buffer_size` unseen online quotes in the cache, filled by
+    # a background thread over one pooled requests.Session. After
+    # BREAKER_FAILURES failed requests in a row the circuit opens and nothing
+    # is fetched until the cooldown passes, so callers never wait on the API.
+    def __init__(self, api_url=API_URL, buffer_size=PREFETCH_SIZE, timeout=API_TIMEOUT,
+                 breaker_failures=BREAKER_FAILURES, breaker_cooldown=BREAKER_COOLDOWN, cache=None, stats=None):
+        self.cache = cache if cache is not None else QuoteCache(path=None)
+        self.stats = stats if stats is not None else QuoteStats()
+        self.api_url = api_url
+        self.buffer_size = buffer_size
+        self.timeout = timeout
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.running = requests is not None
+        self.session = requests.Session() if self.running else None
+        self.cond = threading.Condition()
+        if self.running:
+            threading.Thread(target=self.run, daemon=True).start()
+
+    def pop(self):
+        # O(1); None means "nothing cached, use a local quote"
+        quote = self.cache.take()
+        with self.cond:
+            self.cond.notify_all()
+        return quote
+
+    def breaker_open(self):
+        return time.monotonic() < self.open_until
+
+    def fetch(self):
+        res = self.session.get(self.api_url, timeout=self.timeout)
+        if res.status_code != 200:
+            raise Exception(f"API failed with status {res.status_code}")
+        return [f"{item['q']} – {item['a']}" for item in res.json()]
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.running and (self.cache.fresh_count() >= self.buffer_size or self.breaker_open()):
+                    wait = self.open_until - time.monotonic() if self.breaker_open() else None
+                    self.cond.wait(wait)
+                if not self.running:
+                    return
+
+            start = time.perf_counter()
+            try:
+                quotes = self.fetch()
+            except Exception:
+                self.stats.record_fetch(time.perf_counter() - start, ok=False)
+                with self.cond:
+                    self.failures += 1
+                    if self.failures >= self.breaker_failures:
+                        self.open_until = time.monotonic() + self.breaker_cooldown
+                        self.failures = 0
+                        self.stats.record_breaker_open()
+                continue
+
+            self.stats.record_fetch(time.perf_counter() - start, ok=True)
+            with self.cond:
+                self.failures = 0
+            # Batch endpoints (e.g. /api/quotes) fill several slots per request
+            if not self.cache.add(quotes):
+                # Only duplicates came back, don't hammer the API for more
+                time.sleep(1)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.session is not None:
+            self.session.close()
+
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def split_quote(quote):
+    # Quotes are stored as "text – author"; local quotes may have no author
+    text, sep, author = quote.rpartition(" – ")
+    return (text, author) if sep else (quote, "")
+
+
+class FavoritesStore:
+    # Favorites in an append-only JSON-lines file: one line per saved quote.
+    # A dict from quote to position gives O(1) dedupe; it is built on the
+    # first add or lookup, so startup is just the parse. Word indexes over quote
+    # text and author (with a sorted vocabulary for prefix lookups) are built on
+    # the first search and kept up to date after that.
+    def __init__(self, path=FAVORITES_JOURNAL, legacy_path=FAVORITES_FILE):
+        self.path = path
+        self.items = []
+        self.positions = None
+        self.text_words = None
+        self.author_words = None
+        self.vocabulary = None
+        self.load(legacy_path)
+
+    def load(self, legacy_path):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                text = f.read()
+            try:
+                # One parse for the whole file is much faster than one per line
+                quotes = json.loads("[" + text.rstrip("\n").replace("\n", ",") + "]")
+            except ValueError:
+                # Blank or torn lines: parse line by line instead
+                lines = [line for line in text.splitlines() if line.strip()]
+                quotes = []
+                torn = False
+                for number, line in enumerate(lines, 1):
+                    try:
+                        quotes.append(json.loads(line))
+                    except ValueError:
+                        # Only the last line can be torn by a crash; a bad
+                        # line elsewhere is skipped, keeping the ones after it
+                        torn = number == len(lines)
+                if torn:
+                    # Drop the torn line so later appends start on a clean line
+                    self.rewrite(quotes)
+            self.items = quotes  # add() only ever appends new quotes
+        elif legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, "r") as f:
+                self.items = list(dict.fromkeys(json.load(f)))
+            self.rewrite(self.items)
+
+    def rewrite(self, quotes):
+        # Atomic, so a crash mid-rewrite can't lose the favorites on disk
+        write_atomic(self.path, (json.dumps(quote) + "\n" for quote in quotes))
+
+    def position_map(self):
+        if self.positions is None:
+            self.positions = dict(zip(self.items, range(len(self.items))))
+        return self.positions
+
+    def index(self, quote):
+        if quote in self.position_map():
+            return
+        self.positions[quote] = len(self.items)
+        self.items.append(quote)
+
+    def index_words(self, position):
+        text, author = split_quote(self.items[position])
+        for words, source in ((self.text_words, text), (self.author_words, author)):
+            for word in set(tokenize(source)):
+                words.setdefault(word, []).append(position)
+
+    def build_search_index(self):
+        self.text_words = {}
+        self.author_words = {}
+        for position in range(len(self.items)):
+            self.index_words(position)
+        self.vocabulary = sorted(set(self.text_words) | set(self.author_words))
+
+    def add(self, quote):
+        if not quote or quote in self.position_map():
+            return False
+        self.index(quote)
+        if self.vocabulary is not None:
+            self.index_words(len(self.items) - 1)
+            for word in set(tokenize(quote)):
+                i = bisect.bisect_left(self.vocabulary, word)
+                if i == len(self.vocabulary) or self.vocabulary[i] != word:
+                    self.vocabulary.insert(i, word)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(quote) + "\n")
+        return True
+
+    def __contains__(self, quote):
+        return quote in self.position_map()
+
+    def __len__(self):
+        return len(self.items)
+
+    def page(self, number, size, positions=None):
+        positions = range(len(self.items)) if positions is None else positions
+        return [self.items[i] for i in positions[number * size:(number + 1) * size]]
+
+    def search(self, query, field=None):
+        # Positions of favorites where every query word starts a word in the
+        # text or author (field="text"/"author" limits it to one of them)
+        if self.vocabulary is None:
+            self.build_search_index()
+        indexes = [self.text_words, self.author_words]
+        if field == "text":
+            indexes = [self.text_words]
+        elif field == "author":
+            indexes = [self.author_words]
+
+        result = None
+        for part in tokenize(query):
+            start = bisect.bisect_left(self.vocabulary, part)
+            end = bisect.bisect_left(self.vocabulary, part + "\uffff")
+            matches = set()
+            for word in self.vocabulary[start:end]:
+                for words in indexes:
+                    matches.update(words.get(word, ()))
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result) if result is not None else list(range(len(self.items)))
+
+
+def format_quote(item):
+    # Corpus lines hold either a plain quote string or a zenquotes-style {"q", "a"} object
+    if isinstance(item, dict):
+        return f"{item['q']} – {item['a']}"
+    return item
+
+
+class QuoteCorpus:
+    # Read-only, memory-mapped line-delimited corpus. A sidecar index file holds
+    # the byte offset of every line as a packed uint64, so quote i is one lookup
+    # in the index plus one line read, whatever the corpus size. Startup only
+    # maps the two files; nothing is parsed until a quote is picked.
+    HEADER = struct.Struct("<QQ")  # Corpus size and mtime the index was built from
+    OFFSET = struct.Struct("<Q")
+
+    def __init__(self, path=QUOTES_CORPUS, index_path=None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        if self.index_is_stale():
+            self.build_index()
+
+        self.corpus_file = open(self.path, "rb")
+        self.index_file = open(self.index_path, "rb")
+        self.count = (os.path.getsize(self.index_path) - self.HEADER.size) // self.OFFSET.size
+        self.corpus = mmap.mmap(self.corpus_file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def source_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def index_is_stale(self):
+        if not os.path.exists(self.index_path):
+            return True
+        with open(self.index_path, "rb") as f:
+            header = f.read(self.HEADER.size)
+        return len(header) < self.HEADER.size or self.HEADER.unpack(header) != self.source_stamp()
+
+    def build_index(self):
+        # One streaming pass over the corpus, skipping blank lines
+        def entries(corpus):
+            yield self.HEADER.pack(*self.source_stamp())
+            offset = 0
+            for line in corpus:
+                if line.strip():
+                    yield self.OFFSET.pack(offset)
+                offset += len(line)
+
+        with open(self.path, "rb") as corpus:
+            write_atomic(self.index_path, entries(corpus), binary=True)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        offset, = self.OFFSET.unpack_from(self.index, self.HEADER.size + i * self.OFFSET.size)
+        end = self.corpus.find(b"\n", offset)
+        line = self.corpus[offset:end if end != -1 else len(self.corpus)]
+        return format_quote(json.loads(line))
+
+    def close(self):
+        for m in (self.corpus, self.index):
+            if m is not None:
+                m.close()
+        self.corpus_file.close()
+        self.index_file.close()
+
+
+def convert_quotes_to_corpus(quotes_file=QUOTES_FILE, corpus_file=QUOTES_CORPUS):
+    # One-off conversion of a quotes.json list into the line-delimited corpus
+    with open(quotes_file, "r") as f:
+        quotes = json.load(f)
+    with open(corpus_file, "w") as f:
+        f.writelines(json.dumps(quote) + "\n" for quote in quotes)
+
+
+class FeistelPermutation:
+    # Keyed pseudo-random permutation of range(size) that is computed, never
+    # stored: a balanced Feistel network over the next even power of two, with
+    # cycle walking to stay below size (under four rounds trips on average).
+    ROUNDS = 4
+
+    def __init__(self, size, seed):
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        self.key = seed.to_bytes(8, "little")
+
+    def round(self, r, value):
+        digest = hashlib.blake2b(struct.pack("<IQ", r, value), digest_size=8, key=self.key).digest()
+        return int.from_bytes(digest, "little") & self.mask
+
+    def __getitem__(self, i):
+        x = i
+        while True:
+            left, right = x >> self.half, x & self.mask
+            for r in range(self.ROUNDS):
+                left, right = right, left ^ self.round(r, right)
+            x = (left << self.half) | right
+            if x < self.size:
+                return x
+
+
+class QuoteRotation:
+    # Walks a shuffled order of the corpus without repeats until every quote
+    # has been shown, then reshuffles. The whole state is a seed and a cursor,
+    # however large the corpus is.
+    def __init__(self, size, path=ROTATION_FILE):
+        if size < 1:
+            raise ValueError("Nothing to rotate through: the quote list is empty.")
+        self.size = size
+        self.path = path
+        state = {}
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                state = json.load(f)
+        if state.get("size") == size:
+            self.seed, self.cursor = state["seed"], state["cursor"]
+        else:
+            self.reshuffle()
+        self.permutation = FeistelPermutation(size, self.seed)
+
+    def reshuffle(self):
+        self.seed = random.getrandbits(63)
+        self.cursor = 0
+        self.permutation = FeistelPermutation(self.size, self.seed)
+
+    def next_index(self):
+        if self.cursor >= self.size:
+            self.reshuffle()
+        index = self.permutation[self.cursor]
+        self.cursor += 1
+        if self.path:
+            writer.save(self.path, {"size": self.size, "seed": self.seed, "cursor": self.cursor})
+        return index
+
+
+class QuoteBook:
+    # UI-free quote model behind QuoteApp: local corpus, favorites and the
+    # daily quote.
+    def __init__(self, quotes_file=QUOTES_FILE, favorites_file=FAVORITES_JOURNAL, last_quote_file=LAST_QUOTE_FILE,
+                 fetcher=None, legacy_favorites_file=FAVORITES_FILE, corpus_file=QUOTES_CORPUS,
+                 rotation_file=None, stats=None):
+        self.fetcher = fetcher
+        self.stats = stats or (fetcher.stats if fetcher else QuoteStats())
+        self.corpus_file = corpus_file
+        self.quotes_file = quotes_file
+        self.favorites_file = favorites_file
+        self.last_quote_file = last_quote_file
+        self.quotes = self.load_local_quotes()
+        # With a rotation file local quotes never repeat until all were shown
+        self.rotation = QuoteRotation(len(self.quotes), rotation_file) if rotation_file else None
+        self.favorites = FavoritesStore(favorites_file, legacy_favorites_file)
+        self.current_quote = ""
+
+    def load_local_quotes(self):
+        # A QuoteCorpus and a plain list both support len() and indexing
+        if self.corpus_file and os.path.exists(self.corpus_file):
+            corpus = QuoteCorpus(self.corpus_file)
+            if len(corpus):
+                return corpus
+            corpus.close()
+        if os.path.exists(self.quotes_file):
+            with open(self.quotes_file, "r") as f:
+                quotes = json.load(f)
+            if quotes:
+                return quotes
+        return ["Stay motivated!", "Keep going!"]
+
+    def add_favorite(self, quote):
+        return self.favorites.add(quote)
+
+    def close(self):
+        if isinstance(self.quotes, QuoteCorpus):
+            self.quotes.close()
+
+    def random_quote(self):
+        if self.rotation:
+            return self.quotes[self.rotation.next_index()]
+        return self.quotes[random.randrange(len(self.quotes))]
+
+    def next_quote(self):
+        quote = self.fetcher.pop() if self.fetcher else None
+        if quote is None:
+            quote = self.random_quote()
+            self.stats.record_serve("local")
+        else:
+            self.stats.record_serve("cache")
+        self.current_quote = quote
+        self.save_last_quote()
+        return quote
+
+    def save_last_quote(self):
+        today = str(datetime.date.today())
+        writer.save(self.last_quote_file, {"date": today, "quote": self.current_quote})
+
+    def daily_quote(self):
+        # Today's saved quote, or None when a new one should be picked
+        today = str(datetime.date.today())
+        if os.path.exists(self.last_quote_file):
+            with open(self.last_quote_file, "r") as f:
+                data = json.load(f)
+                if data["date"] == today:
+                    self.current_quote = data["quote"]
+                    return self.current_quote
+        return None
@@ -0,0 +1,159 @@
+from functools import lru_cache
+from datetime import datetime, date, timedelta
+from due_queue import DueQueue
+from todo_storage import JournalTaskStore, SqliteTaskStore
+from todo_query import TaskIndex, SqliteTaskIndex
+
+VIEWS = ["All", "Active", "Completed", "Overdue", "High priority, active"]
+SORTS = ["Added", "Due Date", "Priority"]
+REMINDER_HOUR = 9  # Tasks only carry a date, remind at 09:00 on the due day
+
+
+@lru_cache(maxsize=4096)  # Many tasks share a handful of dates
+def reminder_time(due_date):
+    try:
+        day = date.fromisoformat(due_date)  # Much faster than strptime
+    except ValueError:
+        day = datetime.strptime(due_date, "%Y-%m-%d").date()  # Unpadded, e.g. 2024-1-5
+    return datetime(day.year, day.month, day.day, REMINDER_HOUR)
+
+
+class ReminderQueue(DueQueue):
+    # Reminders of open tasks whose reminder is still ahead; overdue tasks
+    # don't pop up again on every start (the Overdue view lists them).
+    def __init__(self):
+        super().__init__()
+        self.pending = None
+
+    def build(self, open_due_dates, now=None):
+        # The heap is filled on first use, so loading the tasks doesn't wait
+        # on it; `open_due_dates(since)` returns [(due_date, task_id)] of open
+        # tasks due on or after that date, in due date order
+        self.reset([])
+        self.pending = (open_due_dates, now or datetime.now())
+
+    def fill(self):
+        if self.pending is None:
+            return
+        open_due_dates, now = self.pending
+        self.pending = None
+        today = now.date()
+        since = today if now < reminder_time(str(today)) else today + timedelta(days=1)
+        self.reset(((reminder_time(due_date), task_id) for due_date, task_id in open_due_dates(str(since))),
+                   ordered=True)
+
+    def schedule(self, task, now=None):
+        self.cancel(task["id"])
+        if task["completed"] or not task["due_date"]:
+            return
+        remind_at = reminder_time(task["due_date"])
+        if remind_at > (now or datetime.now()):
+            self.push(task["id"], remind_at)
+
+    def cancel(self, task_id):
+        self.fill()
+        super().cancel(task_id)
+
+    def next_time(self):
+        self.fill()
+        return super().next_time()
+
+    def __len__(self):
+        self.fill()
+        return super().__len__()
+
+
+class TodoList:
+    # UI-free task model behind ToDoApp: storage, indexes and views.
+    def __init__(self, backend="journal", **store_args):
+        if backend == "sqlite":
+            self.store = SqliteTaskStore(**store_args)
+            self.index = SqliteTaskIndex(self.store.conn)
+        else:
+            self.store = JournalTaskStore(**store_args)
+            self.index = TaskIndex()
+        self.reminders = ReminderQueue()
+        self.tasks = {}
+
+    def load(self):
+        # Shared with the store, keyed by task id in insertion order
+        self.tasks = self.store.load()
+        self.index.build(self.tasks)
+        self.reminders.build(self.index.open_due_dates)
+        return self.tasks
+
+    def add(self, title, priority, due_date=""):
+        if not title.strip():
+            raise ValueError("Task title is required.")
+        if due_date:
+            try:
+                datetime.strptime(due_date, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+        task = {
+            "title": title,
+            "priority": priority,
+            "due_date": due_date,
+            "completed": False
+        }
+        self.store.add(task)
+        self.index.add(task)
+        self.reminders.schedule(task)
+        return task
+
+    def update(self, task_id, fields):
+        task = self.tasks[task_id]
+        self.index.remove(task)
+        self.store.update(task_id, fields)
+        self.index.add(task)
+        self.reminders.schedule(task)
+        return task
+
+    def rename(self, task_id, title):
+        return self.update(task_id, {"title": title})
+
+    def toggle(self, task_id):
+        return self.update(task_id, {"completed": not self.tasks[task_id]["completed"]})
+
+    def delete(self, task_id):
+        task = self.tasks[task_id]
+        self.index.remove(task)
+        self.store.delete(task_id)
+        self.reminders.cancel(task_id)
+        return task
+
+    def is_default_view(self, view="All", sort="Added", text=""):
+        return view == "All" and sort == "Added" and not text.strip()
+
+    def query(self, view="All", sort="Added", text="", prefix=False):
+        # Returns the ordered task ids for a view, or None for "everything in
+        # insertion order" so callers can skip building the id list.
+        text = text.strip()
+        if self.is_default_view(view, sort, text):
+            return None
+
+        if view == "Overdue":
+            ids = self.index.overdue(str(date.today()))
+        elif view == "High priority, active":
+            ids = self.index.filter("High", completed=False)
+        elif view == "Active":
+            ids = self.index.filter(completed=False)
+        elif view == "Completed":
+            ids = self.index.filter(completed=True)
+        else:
+            ids = None
+
+        if text:
+            matches = self.index.search(text, prefix=prefix)
+            ids = matches if ids is None else [task_id for task_id in ids if task_id in matches]
+
+        if sort == "Due Date":
+            return self.index.sorted_ids("due_date", None if ids is None else set(ids))
+        if sort == "Priority":
+            return self.index.sorted_ids("priority", None if ids is None else set(ids))
+        # Task ids grow in insertion order
+        return sorted(ids) if ids is not None else list(self.tasks)
+
+    def close(self):
+        self.store.close()
@@ -0,0 +1,173 @@
+import bisect
+import re
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+NO_DUE_DATE = "~"  # Sorts after every YYYY-MM-DD string
+
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+
+class TaskIndex:
+    # Sorted indexes on due date and priority plus a word index over titles.
+    # Every view is answered from the indexes instead of rescanning all tasks.
+    def __init__(self):
+        self.tasks = {}
+        self.by_due = []
+        self.by_priority = []
+        self.active = set()
+        self.words = {}
+        self.vocabulary = []
+
+    def build(self, tasks):
+        self.tasks = tasks
+        self.by_due = sorted(self.due_key(task) for task in tasks.values())
+        self.by_priority = sorted(self.priority_key(task) for task in tasks.values())
+        self.active = {task["id"] for task in tasks.values() if not task["completed"]}
+        self.words = {}
+        for task in tasks.values():
+            for word in set(tokenize(task["title"])):
+                self.words.setdefault(word, set()).add(task["id"])
+        self.vocabulary = sorted(self.words)
+
+    def due_key(self, task):
+        return (task["due_date"] or NO_DUE_DATE, task["id"])
+
+    def priority_key(self, task):
+        return (PRIORITY_RANK.get(task["priority"], len(PRIORITY_RANK)), task["id"])
+
+    def add(self, task):
+        bisect.insort(self.by_due, self.due_key(task))
+        bisect.insort(self.by_priority, self.priority_key(task))
+        if not task["completed"]:
+            self.active.add(task["id"])
+        for word in set(tokenize(task["title"])):
+            if word not in self.words:
+                self.words[word] = set()
+                bisect.insort(self.vocabulary, word)
+            self.words[word].add(task["id"])
+
+    def remove(self, task):
+        self.discard_key(self.by_due, self.due_key(task))
+        self.discard_key(self.by_priority, self.priority_key(task))
+        self.active.discard(task["id"])
+        for word in set(tokenize(task["title"])):
+            ids = self.words.get(word)
+            if ids is None:
+                continue
+            ids.discard(task["id"])
+            if not ids:
+                del self.words[word]
+                self.discard_key(self.vocabulary, word)
+
+    def discard_key(self, keys, key):
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    # ---------------- VIEWS ----------------
+    def sorted_ids(self, sort_by="due_date", ids=None):
+        keys = self.by_priority if sort_by == "priority" else self.by_due
+        if ids is None:
+            return [task_id for _, task_id in keys]
+        return [task_id for _, task_id in keys if task_id in ids]
+
+    def overdue(self, today):
+        end = bisect.bisect_left(self.by_due, (today,))
+        return [task_id for _, task_id in self.by_due[:end] if task_id in self.active]
+
+    def open_due_dates(self, since=""):
+        # Open tasks due on or after `since`, in due date order
+        start = bisect.bisect_left(self.by_due, (since,))
+        end = bisect.bisect_left(self.by_due, (NO_DUE_DATE,))
+        return [(due_date, task_id) for due_date, task_id in self.by_due[start:end] if task_id in self.active]
+
+    def filter(self, priority=None, completed=None):
+        if priority is None:
+            start, end = 0, len(self.by_priority)
+        else:
+            rank = PRIORITY_RANK.get(priority, len(PRIORITY_RANK))
+            start = bisect.bisect_left(self.by_priority, (rank,))
+            end = bisect.bisect_left(self.by_priority, (rank + 1,))
+        ids = [task_id for _, task_id in self.by_priority[start:end]]
+        if completed is None:
+            return ids
+        return [task_id for task_id in ids if (task_id not in self.active) == completed]
+
+    def search(self, text, prefix=False):
+        # Each query word must match the start of (prefix) or appear inside
+        # (substring) some title word. Only the vocabulary is scanned, not the tasks.
+        result = None
+        for part in tokenize(text):
+            if prefix:
+                start = bisect.bisect_left(self.vocabulary, part)
+                end = bisect.bisect_left(self.vocabulary, part + "\uffff")
+                matches = self.vocabulary[start:end]
+            else:
+                matches = [word for word in self.vocabulary if part in word]
+            ids = set()
+            for word in matches:
+                ids |= self.words[word]
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set(self.tasks)
+
+
+class SqliteTaskIndex:
+    # TaskIndex views answered by SQL against SqliteTaskStore. The table indexes
+    # and the FTS5 triggers keep themselves up to date, so add/remove do nothing.
+    def __init__(self, conn):
+        self.conn = conn
+
+    def build(self, tasks):
+        pass
+
+    def add(self, task):
+        pass
+
+    def remove(self, task):
+        pass
+
+    def ids(self, query, params=()):
+        return [task_id for (task_id,) in self.conn.execute(query, params)]
+
+    def sorted_ids(self, sort_by="due_date", ids=None):
+        if sort_by == "priority":
+            order = self.ids("SELECT id FROM tasks ORDER BY priority_rank, id")
+        else:
+            order = self.ids("SELECT id FROM tasks ORDER BY due_date = '', due_date, id")
+        if ids is None:
+            return order
+        return [task_id for task_id in order if task_id in ids]
+
+    def overdue(self, today):
+        return self.ids("SELECT id FROM tasks WHERE completed=0 AND due_date != '' AND due_date < ? "
+                        "ORDER BY due_date, id", (today,))
+
+    def open_due_dates(self, since=""):
+        return self.conn.execute("SELECT due_date, id FROM tasks WHERE completed=0 AND due_date != '' "
+                                 "AND due_date >= ? ORDER BY due_date, id", (since,)).fetchall()
+
+    def filter(self, priority=None, completed=None):
+        clauses, params = [], []
+        if priority is not None:
+            clauses.append("priority_rank=?")
+            params.append(PRIORITY_RANK.get(priority, len(PRIORITY_RANK)))
+        if completed is not None:
+            clauses.append("completed=?")
+            params.append(int(completed))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.ids(f"SELECT id FROM tasks {where} ORDER BY priority_rank, id", params)
+
+    def search(self, text, prefix=False):
+        words = tokenize(text)
+        if not words:
+            return set(self.ids("SELECT id FROM tasks"))
+        if prefix:
+            match = " AND ".join(f'"{word}"*' for word in words)
+            return set(self.ids("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?", (match,)))
+        # FTS5 only matches whole tokens or prefixes, substrings need LIKE
+        where = " AND ".join("title LIKE ?" for _ in words)
+        return set(self.ids(f"SELECT id FROM tasks WHERE {where}", [f"%{word}%" for word in words]))
@@ -0,0 +1,266 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Mapping
+from todo_query import PRIORITY_RANK
+from persistence import write_json_atomic
+
+TASKS_FILE = "tasks.json"
+JOURNAL_FILE = "tasks.journal"
+TASKS_DB = "tasks.db"
+COMPACT_MIN_RECORDS = 1000
+ROW_CACHE_SIZE = 4096
+
+
+class JournalTaskStore:
+    # tasks.json is the snapshot, tasks.journal holds one compact JSON record per
+    # mutation since the last snapshot. Every write is a single appended line.
+    def __init__(self, snapshot_file=TASKS_FILE, journal_file=JOURNAL_FILE):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.tasks = {}
+        self.next_id = 1
+        self.journal_records = 0
+        self.journal = None
+
+    def load(self):
+        self.tasks = {}
+        needs_compact = False
+
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, "r") as f:
+                snapshot = json.load(f)
+            # Old files are a bare list of tasks without ids
+            if isinstance(snapshot, list):
+                snapshot = {"tasks": snapshot}
+                needs_compact = True
+            for task in snapshot["tasks"]:
+                if "id" not in task:
+                    task["id"] = self.next_id
+                    needs_compact = True
+                self.tasks[task["id"]] = task
+                self.next_id = max(self.next_id, task["id"] + 1)
+            self.next_id = max(self.next_id, snapshot.get("next_id", 1))
+
+        self.journal_records = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash; compacting below also drops
+                        # the partial line so new records start on a clean one
+                        needs_compact = True
+                        break
+                    self.apply(record)
+                    self.journal_records += 1
+
+        if needs_compact or self.journal_records >= self.compact_threshold():
+            self.compact()
+        return self.tasks
+
+    def apply(self, record):
+        op = record["op"]
+        if op == "add":
+            task = record["task"]
+            self.tasks[task["id"]] = task
+            self.next_id = max(self.next_id, task["id"] + 1)
+        elif op == "update":
+            if record["id"] in self.tasks:
+                self.tasks[record["id"]].update(record["fields"])
+        elif op == "delete":
+            self.tasks.pop(record["id"], None)
+
+    def new_id(self):
+        task_id = self.next_id
+        self.next_id += 1
+        return task_id
+
+    def add(self, task):
+        if "id" not in task:
+            task["id"] = self.new_id()
+        self.tasks[task["id"]] = task
+        self.append({"op": "add", "task": task})
+        return task["id"]
+
+    def update(self, task_id, fields):
+        self.tasks[task_id].update(fields)
+        self.append({"op": "update", "id": task_id, "fields": fields})
+
+    def delete(self, task_id):
+        del self.tasks[task_id]
+        self.append({"op": "delete", "id": task_id})
+
+    def append(self, record):
+        if self.journal is None:
+            self.journal = open(self.journal_file, "a")
+        self.journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.journal.flush()
+        self.journal_records += 1
+        if self.journal_records >= self.compact_threshold():
+            self.compact()
+
+    def compact_threshold(self):
+        # Growing with the task count keeps the snapshot rewrite amortised O(1)
+        return max(COMPACT_MIN_RECORDS, len(self.tasks))
+
+    def compact(self):
+        # Synchronous on purpose: the journal may only be truncated once the
+        # snapshot that replaces it is safely on disk.
+        write_json_atomic(self.snapshot_file, {"next_id": self.next_id, "tasks": list(self.tasks.values())})
+
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = open(self.journal_file, "w")
+        self.journal_records = 0
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+class SqliteTaskRows(Mapping):
+    # Read-through view of the tasks table. Only rows that are actually looked
+    # up (e.g. the visible window) are fetched, and a bounded LRU keeps them.
+    def __init__(self, conn, cache_size=ROW_CACHE_SIZE):
+        self.conn = conn
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def __getitem__(self, task_id):
+        task = self.cache.get(task_id)
+        if task is not None:
+            self.cache.move_to_end(task_id)
+            return task
+        row = self.conn.execute("SELECT id, title, priority, due_date, completed FROM tasks WHERE id=?",
+                                (task_id,)).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        return self.remember(row_to_task(row))
+
+    def remember(self, task):
+        self.cache[task["id"]] = task
+        self.cache.move_to_end(task["id"])
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return task
+
+    def forget(self, task_id):
+        self.cache.pop(task_id, None)
+
+    def __iter__(self):
+        for (task_id,) in self.conn.execute("SELECT id FROM tasks ORDER BY id"):
+            yield task_id
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def __contains__(self, task_id):
+        if task_id in self.cache:
+            return True
+        return self.conn.execute("SELECT 1 FROM tasks WHERE id=?", (task_id,)).fetchone() is not None
+
+
+def row_to_task(row):
+    task_id, title, priority, due_date, completed = row
+    return {"id": task_id, "title": title, "priority": priority, "due_date": due_date,
+            "completed": bool(completed)}
+
+
+class SqliteTaskStore:
+    # Same interface as JournalTaskStore, but tasks stay on disk and are pulled
+    # in per view. priority_rank, due_date and completed are indexed, and
+    # tasks_fts is an FTS5 index over titles kept in sync by triggers.
+    def __init__(self, db_file=TASKS_DB, snapshot_file=TASKS_FILE, journal_file=JOURNAL_FILE):
+        self.db_file = db_file
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.conn = sqlite3.connect(db_file)
+        self.tasks = SqliteTaskRows(self.conn)
+
+    def load(self):
+        new_db = self.conn.execute("SELECT name FROM sqlite_master WHERE name='tasks'").fetchone() is None
+        self.init_db()
+        if new_db:
+            self.import_journal()
+        return self.tasks
+
+    def init_db(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                priority TEXT,
+                priority_rank INTEGER,
+                due_date TEXT,
+                completed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority_rank, id);
+            CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (due_date, id);
+            CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed, id);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5 (title, content='tasks', content_rowid='id');
+            CREATE TRIGGER IF NOT EXISTS tasks_ai AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+            END;
+            CREATE TRIGGER IF NOT EXISTS tasks_ad AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END;
+            CREATE TRIGGER IF NOT EXISTS tasks_au AFTER UPDATE OF title ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+            END;
+        """)
+        self.conn.commit()
+
+    def import_journal(self):
+        # Carry tasks over from tasks.json / tasks.journal the first time
+        if not (os.path.exists(self.snapshot_file) or os.path.exists(self.journal_file)):
+            return
+        journal = JournalTaskStore(self.snapshot_file, self.journal_file)
+        tasks = journal.load()
+        journal.close()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO tasks (id, title, priority, priority_rank, due_date, completed) VALUES (?, ?, ?, ?, ?, ?)",
+                [self.task_row(task) for task in tasks.values()])
+
+    def task_row(self, task):
+        return (task.get("id"), task["title"], task["priority"], priority_rank(task["priority"]),
+                task["due_date"], int(task["completed"]))
+
+    def add(self, task):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO tasks (id, title, priority, priority_rank, due_date, completed) VALUES (?, ?, ?, ?, ?, ?)",
+                self.task_row(task))
+        task["id"] = cursor.lastrowid
+        self.tasks.remember(task)
+        return task["id"]
+
+    def update(self, task_id, fields):
+        columns = dict(fields)
+        if "priority" in columns:
+            columns["priority_rank"] = priority_rank(columns["priority"])
+        if "completed" in columns:
+            columns["completed"] = int(columns["completed"])
+        assignments = ", ".join(f"{column}=?" for column in columns)
+        with self.conn:
+            self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id=?", (*columns.values(), task_id))
+        if task_id in self.tasks.cache:
+            self.tasks.cache[task_id].update(fields)
+
+    def delete(self, task_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+        self.tasks.forget(task_id)
+
+    def close(self):
+        self.conn.close()
+
+
+def priority_rank(priority):
+    return PRIORITY_RANK.get(priority, len(PRIORITY_RANK))